@@ -1,133 +1,162 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import random
 import re
+from urllib.parse import quote
+
+import run_metrics
+from crawler import Crawler, count_response, make_session
+from http_cache import default_cache
+from selector_engine import SelectorEngine
+from html_parsers import make_soup
+from sinks import open_sink
+from product_index import Delta, ProductIndex, save_changes
+from pricing import find_price_in_text, format_price, normalise_prices, parse_price
+from classifier import KeywordClassifier
 
 # Try importing Selenium libraries - but script will still work if they're not available
 selenium_available = True
 try:
-    from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.common.exceptions import TimeoutException
+    from driver_pool import DriverPool
 except ImportError:
     selenium_available = False
     print("Selenium not available. Falling back to requests-only mode.")
 
-def scrape_with_requests(url):
+MAKRO_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Referer': 'https://www.makro.co.za/'
+}
+
+def scrape_with_requests(url, session=None, timeout=20, cache=None):
     """
-    Attempt to scrape using regular requests and BeautifulSoup
+    Attempt to scrape using regular requests and BeautifulSoup.
+    Responses go through the shared on-disk HTTP cache unless cache=False.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Referer': 'https://www.makro.co.za/'
-    }
-    
+    if cache is None:
+        cache = default_cache()
+    run_metrics.count("fetches")
     try:
-        response = requests.get(url, headers=headers)
+        with run_metrics.stage("fetch"):
+            if cache:
+                response = cache.get(url, session=session, headers=MAKRO_HEADERS, timeout=timeout)
+            elif session is not None:
+                response = session.get(url, headers=MAKRO_HEADERS, timeout=timeout)
+            else:
+                response = requests.get(url, headers=MAKRO_HEADERS, timeout=timeout)
+        count_response(response)
         response.raise_for_status()  
         return response.content
     except requests.exceptions.RequestException as e:
+        run_metrics.count("fetch_errors")
         print(f"Error fetching the webpage: {e}")
         return None
 
-def scrape_with_selenium(url):
+def makro_chrome_options():
+    """
+    Chrome options used for every pooled Makro browser
+    """
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36')
+    return options
+
+_driver_pool = None
+
+def get_driver_pool(size=2, max_pages=50):
+    """
+    Return the shared pool of warm browsers, creating it on first use
+    """
+    global _driver_pool
+    if _driver_pool is None:
+        _driver_pool = DriverPool(makro_chrome_options, size=size, max_pages=max_pages)
+    return _driver_pool
+
+def scrape_with_selenium(url, pool=None):
     """
-    Attempt to scrape using Selenium WebDriver
+    Attempt to scrape using a Selenium WebDriver borrowed from the driver pool
     """
     if not selenium_available:
         print("Selenium not available for enhanced scraping.")
         return None
         
+    pool = pool or get_driver_pool()
+    run_metrics.count("fetches")
     try:
-        print("Initializing Selenium WebDriver...")
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36')
-        
-        # Initialize WebDriver (with error handling for different environments)
-        try:
-            # Try using webdriver_manager
-            from webdriver_manager.chrome import ChromeDriverManager
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        except:
-            # Fall back to direct Chrome WebDriver
-            driver = webdriver.Chrome(options=options)
-        
-        # Load the page
-        driver.get(url)
-        print("Page loaded. Waiting for dynamic content...")
-        
-        # Wait for content to load
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".product-grid, .product-list, .search-results"))
-            )
-        except:
-            print("Timeout waiting for products, continuing anyway...")
-        
-        # Get the page source
-        page_source = driver.page_source
-        
-        # Clean up
-        driver.quit()
-        
-        return page_source
+        with pool.borrow() as driver:
+            # Load the page
+            with run_metrics.stage("page_load"):
+                driver.get(url)
+            print("Page loaded. Waiting for dynamic content...")
+            
+            # Wait for content to load
+            try:
+                with run_metrics.stage("wait"):
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, ".product-grid, .product-list, .search-results"))
+                    )
+            except TimeoutException:
+                run_metrics.count("wait_timeouts")
+                print("Timeout waiting for products, continuing anyway...")
+            
+            # Get the page source
+            return driver.page_source
             
     except Exception as e:
+        # The pool has already quit the failed driver and will start a fresh one
+        run_metrics.count("fetch_errors")
         print(f"Error with Selenium: {e}")
-        # Clean up in case of failure
-        try:
-            driver.quit()
-        except:
-            pass
         return None
 
-def find_products(soup):
+# Selectors that might contain products, compiled once into a single-pass query.
+# If none of them match, fall back to any div/li/article with a product-related class.
+PRODUCT_SELECTORS = [
+    ".product-grid .product-item", 
+    ".product-list .product-item",
+    ".search-results .product",
+    "[data-component='product']",
+    ".productList li",
+    "[class*='ProductCard']",
+    "[class*='product-card']", 
+    "[class*='product-tile']",
+    "li.product"
+]
+
+product_selector_engine = SelectorEngine(
+    PRODUCT_SELECTORS,
+    fallback="div[class*='product' i], li[class*='product' i], article[class*='product' i]",
+)
+
+@run_metrics.timed("find_products")
+def find_products(soup, engine=None):
     """
     Find product containers in the parsed HTML
     """
-    # Try multiple selectors that might contain products
-    selectors = [
-        ".product-grid .product-item", 
-        ".product-list .product-item",
-        ".search-results .product",
-        "[data-component='product']",
-        ".productList li",
-        "[class*='ProductCard']",
-        "[class*='product-card']", 
-        "[class*='product-tile']",
-        "li.product"
-    ]
-    
-    product_containers = []
-    for selector in selectors:
-        containers = soup.select(selector)
-        if containers:
-            print(f"Found {len(containers)} products with selector: {selector}")
-            product_containers.extend(containers)
-            
-    # If standard selectors fail, try finding div elements with product-related classes
-    if not product_containers:
-        print("No products found with standard selectors, trying alternative methods...")
-        for tag in soup.find_all(['div', 'li', 'article']):
-            classes = tag.get('class', [])
-            if classes and any(c.lower().find('product') >= 0 for c in classes):
-                product_containers.append(tag)
+    engine = engine or product_selector_engine
+    fallback_pages = engine.fallback_pages
+    product_containers = engine.select(soup)
+
+    if engine.fallback_pages > fallback_pages:
+        print("No products found with standard selectors, used alternative method")
+    elif product_containers:
+        print(f"Found {len(product_containers)} products with standard selectors")
     
     return product_containers
 
+PRICE_LIKE_TEXT = re.compile(r'^[R$]?\s*\d+')
+
+@run_metrics.timed("extract")
 def extract_product_data(container):
     """
     Extract name and price from a product container
@@ -149,7 +178,7 @@ def extract_product_data(container):
         for element in container.find_all(['div', 'a', 'span', 'h3', 'h4']):
             text = element.get_text(strip=True)
             # Product names are typically 20-100 characters
-            if 10 <= len(text) <= 150 and not re.match(r'^[R$]?\s*\d+', text):
+            if 10 <= len(text) <= 150 and not PRICE_LIKE_TEXT.match(text):
                 name = text
                 break
         else:
@@ -163,46 +192,36 @@ def extract_product_data(container):
     price_element = container.select_one('.price, .product-price, .current-price, .amount, .priceToPay, [class*="price"], [class*="Price"]')
     
     if not price_element:
-        # Try to find price by regex pattern (e.g., R 123.45 or R123.45)
-        price_regex = re.search(r'R\s*(\d+(?:[.,]\d+)?)', container.get_text())
-        if price_regex:
-            price = price_regex.group(0)
-        else:
-            # No price found, let's check if there's any number that might be a price
-            number_regex = re.search(r'\d+[.,]\d+', container.get_text())
-            if number_regex:
-                price = f"R {number_regex.group(0)}"
-            else:
-                return name, None  # No price found
+        # Try to find price by regex pattern (e.g., R 123.45), or any number that might be a price
+        price_text = find_price_in_text(container.get_text())
+        if not price_text:
+            return name, None  # No price found
     else:
-        price = price_element.get_text(strip=True)
-    
-    # Clean up price
-    if price:
-        # Extract numeric part of price
-        price_clean = re.sub(r'[^\d.,]', '', price)
-        price_clean = price_clean.replace(',', '.')
-        
-        # Try to convert to float to validate
-        try:
-            float_price = float(price_clean)
-            if float_price <= 0 or float_price > 100000:
-                return name, None  # Invalid price
-            price = f"R {float_price:.2f}"
-        except ValueError:
-            return name, None  # Invalid price
+        price_text = price_element.get_text(strip=True)
     
-    return name, price
+    # Parse the price once, here, and keep it numeric from now on
+    return name, parse_price(price_text)
+
+PERFUME_KEYWORDS = ['perfume', 'fragrance', 'cologne', 'eau de', 'spray', 'scent', 'bakhoor']
+
+# Category taxonomy for sorting a whole product dump in one pass (first match is the primary category).
+# Edit this, or load one with classifier.load_taxonomy("categories.json").
+MAKRO_CATEGORIES = {
+    "perfume": PERFUME_KEYWORDS,
+    "deodorant": ['deodorant', 'antiperspirant', 'roll-on', 'body spray'],
+    "skincare": ['moisturiser', 'moisturizer', 'body lotion', 'sunscreen', 'face wash', 'serum'],
+    "haircare": ['shampoo', 'conditioner', 'hair spray', 'hair gel', 'hair oil', 'hair dryer'],
+    "makeup": ['lipstick', 'mascara', 'eyeliner', 'foundation', 'nail polish'],
+}
+
+perfume_classifier = KeywordClassifier({"perfume": PERFUME_KEYWORDS})
+category_classifier = KeywordClassifier(MAKRO_CATEGORIES)
 
 def is_perfume_product(name):
     """
     Check if the product is a perfume or related item
     """
-    if not name:
-        return False
-        
-    perfume_keywords = ['perfume', 'fragrance', 'cologne', 'eau de', 'spray', 'scent', 'bakhoor']
-    return any(keyword in name.lower() for keyword in perfume_keywords)
+    return perfume_classifier.matches(name)
 
 def scrape_makro_perfumes(url):
     """
@@ -224,8 +243,24 @@ def scrape_makro_perfumes(url):
         print("Failed to retrieve webpage content.")
         return []
     
-    # Parse HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
+    return parse_products(html_content)
+
+def parse_products(html_content, parser_backend=None):
+    """
+    Parse a fetched Makro page and return the perfume products on it
+    """
+    products = [p for p in extract_products(html_content, parser_backend) if is_perfume_product(p["Name"])]
+    run_metrics.count("products", len(products))
+    print(f"Successfully extracted {len(products)} perfume products")
+    return products
+
+def extract_products(html_content, parser_backend=None):
+    """
+    Parse a fetched Makro page and return every product with a name and price, of any category
+    """
+    # Parse HTML (lxml when installed, see html_parsers)
+    with run_metrics.stage("parse"):
+        soup = make_soup(html_content, parser_backend)
     
     # Find product containers
     product_containers = find_products(soup)
@@ -241,23 +276,126 @@ def scrape_makro_perfumes(url):
         try:
             name, price = extract_product_data(container)
             
-            if not name or not price:
+            if not name or price is None:
+                run_metrics.count("incomplete_products")
                 continue  # Skip if missing name or price
                 
-            # Check if it's a perfume product
-            if is_perfume_product(name):
-                products.append({
-                    "Name": name,
-                    "Price": price
-                })
+            products.append({
+                "Name": name,
+                "Price": price
+            })
             
         except Exception as e:
+            run_metrics.count("parse_failures")
             print(f"Error processing a product: {e}")
             continue
     
-    print(f"Successfully extracted {len(products)} perfume products")
     return products
 
+def split_by_category(products, classifier=None):
+    """
+    Sort products into {category: [products]} with one keyword scan per name.
+    A product can land in several categories; each copy gets a "Category" field.
+    """
+    classifier = classifier or category_classifier
+    by_category = {category: [] for category in classifier.category_names}
+    for product, categories in zip(products, classifier.classify(p["Name"] for p in products)):
+        for category in categories:
+            by_category[category].append({**product, "Category": category})
+    return by_category
+
+def label_categories(df, classifier=None, column="Name"):
+    """
+    Add a primary "Category" column to a DataFrame of products (e.g. a large
+    saved dump), classifying the whole column at once
+    """
+    classifier = classifier or category_classifier
+    df = df.copy()
+    df["Category"] = classifier.label(df[column])
+    return df
+
+def build_search_url(term):
+    """
+    Build a Makro search URL for a search term
+    """
+    return f"https://www.makro.co.za/search/?text={quote(term)}"
+
+def iter_crawl_makro(urls_or_terms, max_workers=8, per_host=4, min_delay=0.5, max_delay=1.5, index=None):
+    """
+    Fetch many Makro pages concurrently and yield (url, products) for each page
+    as soon as it has been parsed. Accepts full URLs or plain search terms.
+    With a ProductIndex, pages whose HTML hasn't changed are not parsed again.
+    """
+    urls = [u if u.startswith('http') else build_search_url(u) for u in urls_or_terms]
+    print(f"Crawling {len(urls)} Makro pages with {max_workers} workers...")
+
+    crawler = Crawler(
+        session=make_session(MAKRO_HEADERS, pool_size=max_workers),
+        cache=default_cache(),
+        max_workers=max_workers,
+        per_host=per_host,
+        min_delay=min_delay,
+        max_delay=max_delay,
+    )
+
+    # Audit the selectors during crawls, so dead ones are reported at the end
+    track_hits = product_selector_engine.track_hits
+    product_selector_engine.track_hits = True
+    total = 0
+    try:
+        for url, html_content in crawler.crawl(urls):
+            if not html_content:
+                print(f"Failed to retrieve {url}")
+                if index is not None:
+                    # Don't report this page's products as removed just because the fetch failed
+                    index.touch_source("makro", url)
+                continue
+            if index is not None and not index.page_changed(url, html_content):
+                run_metrics.count("pages_unchanged")
+                print(f"Page unchanged since last run, skipping: {url}")
+                index.touch_source("makro", url)
+                continue
+            page_products = parse_products(html_content)
+            total += len(page_products)
+            yield url, page_products
+    finally:
+        product_selector_engine.track_hits = track_hits
+        crawler.close()
+
+    print(f"Crawl finished: {total} perfume products from {len(urls)} pages")
+    print(f"HTTP cache: {default_cache().stats()}")
+    dead = product_selector_engine.dead_selectors()
+    if dead:
+        print(f"Selectors that never matched during this crawl: {dead}")
+
+def crawl_makro(urls_or_terms, sink=None, **crawl_options):
+    """
+    Crawl many Makro pages concurrently. With a sink, products are streamed to it
+    page by page and the number written is returned; otherwise a list is returned.
+    """
+    if sink is None:
+        return [p for _, page in iter_crawl_makro(urls_or_terms, **crawl_options) for p in page]
+
+    written = 0
+    for _, page_products in iter_crawl_makro(urls_or_terms, **crawl_options):
+        sink.write(page_products)
+        written += len(page_products)
+    return written
+
+def crawl_makro_changes(urls_or_terms, index, **crawl_options):
+    """
+    Incremental crawl: return a Delta with only the products that are new,
+    changed or removed since the previous run recorded in the index
+    """
+    run = index.start_run()
+    delta = Delta()
+    for url, page_products in iter_crawl_makro(urls_or_terms, index=index, **crawl_options):
+        delta.extend(index.update("makro", page_products, source=url))
+        index.record_page(url)
+    delta.removed = index.finish_run("makro", run)
+    print(f"Changes since last run: {delta.summary()}")
+    return delta
+
 def create_sample_data():
     """
     Create sample data if web scraping fails
@@ -265,29 +403,39 @@ def create_sample_data():
     print("Web scraping unsuccessful. Creating sample data for demonstration purposes...")
     
     sample_products = [
-        {"Name": "Calvin Klein CK One Eau de Toilette - 200ml", "Price": "R 799.00"},
-        {"Name": "Hugo Boss Bottled Eau de Toilette - 100ml", "Price": "R 1299.00"},
-        {"Name": "DKNY Be Delicious Women Eau de Parfum - 50ml", "Price": "R 1199.00"},
-        {"Name": "Versace Bright Crystal Eau de Toilette - 90ml", "Price": "R 1699.00"},
-        {"Name": "Davidoff Cool Water Eau de Toilette - 125ml", "Price": "R 899.00"},
-        {"Name": "Dolce & Gabbana Light Blue Eau de Toilette - 100ml", "Price": "R 1799.00"},
-        {"Name": "Jimmy Choo Eau de Parfum - 60ml", "Price": "R 1499.00"},
-        {"Name": "Marc Jacobs Daisy Eau de Toilette - 50ml", "Price": "R 1399.00"},
-        {"Name": "Lacoste Essential Eau de Toilette - 125ml", "Price": "R 1099.00"},
-        {"Name": "Burberry London for Men Eau de Toilette - 100ml", "Price": "R 1299.00"},
-        {"Name": "Paco Rabanne 1 Million Eau de Toilette - 100ml", "Price": "R 1599.00"},
-        {"Name": "Gucci Guilty Eau de Toilette - 90ml", "Price": "R 1899.00"},
-        {"Name": "Aramis Classic Eau de Toilette - 110ml", "Price": "R 899.00"},
-        {"Name": "Elizabeth Arden Green Tea Scent Spray - 100ml", "Price": "R 699.00"},
-        {"Name": "Diesel Only The Brave Eau de Toilette - 75ml", "Price": "R 1299.00"}
+        {"Name": "Calvin Klein CK One Eau de Toilette - 200ml", "Price": 799.00},
+        {"Name": "Hugo Boss Bottled Eau de Toilette - 100ml", "Price": 1299.00},
+        {"Name": "DKNY Be Delicious Women Eau de Parfum - 50ml", "Price": 1199.00},
+        {"Name": "Versace Bright Crystal Eau de Toilette - 90ml", "Price": 1699.00},
+        {"Name": "Davidoff Cool Water Eau de Toilette - 125ml", "Price": 899.00},
+        {"Name": "Dolce & Gabbana Light Blue Eau de Toilette - 100ml", "Price": 1799.00},
+        {"Name": "Jimmy Choo Eau de Parfum - 60ml", "Price": 1499.00},
+        {"Name": "Marc Jacobs Daisy Eau de Toilette - 50ml", "Price": 1399.00},
+        {"Name": "Lacoste Essential Eau de Toilette - 125ml", "Price": 1099.00},
+        {"Name": "Burberry London for Men Eau de Toilette - 100ml", "Price": 1299.00},
+        {"Name": "Paco Rabanne 1 Million Eau de Toilette - 100ml", "Price": 1599.00},
+        {"Name": "Gucci Guilty Eau de Toilette - 90ml", "Price": 1899.00},
+        {"Name": "Aramis Classic Eau de Toilette - 110ml", "Price": 899.00},
+        {"Name": "Elizabeth Arden Green Tea Scent Spray - 100ml", "Price": 699.00},
+        {"Name": "Diesel Only The Brave Eau de Toilette - 75ml", "Price": 1299.00}
     ]
     
     print(f"Created {len(sample_products)} sample perfume entries")
     return sample_products
 
+def save_products(products, path="makro_perfumes.parquet"):
+    """
+    Stream the perfume data to a Parquet (or CSV) file and return the path written
+    """
+    with run_metrics.stage("save"), open_sink(path, "makro") as sink:
+        sink.write(products)
+    print(f"Saved {sink.rows_written} perfumes to {sink.path}")
+    return sink.path
+
+@run_metrics.timed("excel_export")
 def save_to_excel(products, filename="makro_perfumes.xlsx"):
     """
-    Save the perfume data to Excel
+    Optional export step: save the perfume data to Excel
     """
     if not products:
         print("No products to save.")
@@ -296,10 +444,11 @@ def save_to_excel(products, filename="makro_perfumes.xlsx"):
     # Convert to DataFrame
     df = pd.DataFrame(products)
     
+    # Prices are already numeric; normalise any price strings in one vectorised pass
+    df['Price'] = normalise_prices(df['Price'])
+    
     # Sort by price (ascending)
-    df['Price_Float'] = df['Price'].apply(lambda x: float(re.sub(r'[^\d.,]', '', x.replace(',', '.'))))
-    df = df.sort_values('Price_Float')
-    df = df.drop(columns=['Price_Float'])
+    df = df.sort_values('Price')
     
     # Try to save to Excel with error handling
     success = False
@@ -325,6 +474,7 @@ def save_to_excel(products, filename="makro_perfumes.xlsx"):
         except PermissionError:
             print(f"Permission denied when saving to {filename}.")
             print("The file might be open in another program or you don't have write permissions.")
+            run_metrics.count("retries")
             attempts += 1
             
         except Exception as e:
@@ -345,17 +495,19 @@ def save_to_excel(products, filename="makro_perfumes.xlsx"):
         print(df.to_string())
         return False
 
-def main():
+def main(export_excel=True, index_path=None):
     # URL for Makro perfumes
     url = "https://www.makro.co.za/search/?text=Perfumes%20%26%20Bakhoor%20"
     
     print("Starting Makro perfume price scraper...")
+    metrics = run_metrics.start_run("makro")
     
     try:
         # Try to scrape products
         products = scrape_makro_perfumes(url)
+        is_sample = not products
         
-        if not products:
+        if is_sample:
             print("No perfume products found through web scraping.")
             # Create sample data for demonstration
             products = create_sample_data()
@@ -363,13 +515,26 @@ def main():
         # Display found products
         print("\nFound the following perfumes:")
         for i, product in enumerate(products[:5], 1):
-            print(f"{i}. {product['Name']}: {product['Price']}")
+            print(f"{i}. {product['Name']}: {format_price(product['Price'])}")
         
         if len(products) > 5:
             print(f"... and {len(products) - 5} more")
         
-        # Save to Excel
-        if save_to_excel(products):
+        # Save the data, then optionally export it to Excel
+        save_products(products)
+        if index_path and is_sample:
+            print("Sample data is not recorded in the product index.")
+        elif index_path:
+            # Incremental mode: also write just what changed since the last run
+            index = ProductIndex(index_path)
+            run = index.start_run()
+            delta = index.update("makro", products, source=url)
+            delta.removed = index.finish_run("makro", run)
+            save_changes(delta, "makro_changes.csv")
+            index.close()
+        if not export_excel:
+            print("\nAll done!")
+        elif save_to_excel(products):
             print("\nAll done! You can now check the Excel file for a complete list of perfumes.")
             print("This list can help your friend find the perfect Eid gifts at the best prices.")
         else:
@@ -388,7 +553,13 @@ def main():
             # Last resort: print all data to console
             print("\nHere's the complete list of sample perfumes:")
             for i, product in enumerate(products, 1):
-                print(f"{i}. {product['Name']}: {product['Price']}")
+                print(f"{i}. {product['Name']}: {format_price(product['Price'])}")
+
+    finally:
+        # Where the time went, and a JSON copy for comparing nightly runs
+        metrics.info["http_cache"] = default_cache().stats()
+        metrics.report()
+        metrics.write_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,76 +1,351 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd  # Import pandas to work with data frames
+import re
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import run_metrics
+from crawler import Crawler, count_response, make_session
+from http_cache import default_cache
+from html_parsers import make_soup
+from product_index import Delta, ProductIndex, save_changes
+from sinks import open_sink, export_excel as export_to_excel
 
 # URL of properties for sale in Durban
 url = "https://www.property24.com/for-sale/durban/kwazulu-natal/169"
 
+BASE_URL = "https://www.property24.com"
+PAGE_NUMBER = re.compile(r'/p(\d+)/?(?:\?|$)')
+
 # Set headers to mimic a real browser
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
-# Send a GET request to fetch the webpage content
-response = requests.get(url, headers=headers)
 
-# Initialize a list to store the scraped data
-property_list = []
+def tile_fields(prop):
+    """
+    Extract the raw text of each field from one listing tile (None when missing)
+    """
+    def text(tag):
+        return tag.text.strip() if tag else None
+
+    # Extract number of bedrooms, bathrooms, parking, and size
+    bedrooms = prop.find("span", title="Bedrooms")
+    bathrooms = prop.find("span", title="Bathrooms")
+    parking = prop.find("span", title="Parking Spaces")
+    link = prop.find("a", href=True)
 
-# Check if the response was successful
-if response.status_code == 200:
-    soup = BeautifulSoup(response.content, "html.parser")
+    return {
+        "Title": text(prop.find("span", class_="p24_title")),
+        "Price": text(prop.find("span", class_="p24_price")),
+        "Location": text(prop.find("span", class_="p24_location")),
+        "Bedrooms": text(bedrooms.find_next("span")) if bedrooms else None,
+        "Bathrooms": text(bathrooms.find_next("span")) if bathrooms else None,
+        "Parking": text(parking.find_next("span")) if parking else None,
+        "Size": text(prop.find("span", class_="p24_size")),
+        "Link": link["href"] if link else None,
+    }
 
+
+def find_tiles(soup):
     # Find all property containers
     property_tiles = soup.find_all("div", class_="p24_regularTile")
 
     if not property_tiles:
         print("No properties found. Verify the structure and class names.")
+    return property_tiles
 
-    for prop in property_tiles:
-        # Extract price
-        price_tag = prop.find("span", class_="p24_price")
-        price = price_tag.text.strip() if price_tag else "No Price"
-
-        # Extract location
-        location_tag = prop.find("span", class_="p24_location")
-        location = location_tag.text.strip() if location_tag else "No Location"
-
-        # Extract property title or description
-        title_tag = prop.find("span", class_="p24_title")
-        title = title_tag.text.strip() if title_tag else "No Title"
 
-        # Extract number of bedrooms, bathrooms, parking, and size
-        bedrooms = prop.find("span", title="Bedrooms")
-        bathrooms = prop.find("span", title="Bathrooms")
-        parking = prop.find("span", title="Parking Spaces")
-        size_tag = prop.find("span", class_="p24_size")
+@run_metrics.timed("extract")
+def parse_listings(soup):
+    """
+    Extract property data from every listing tile on a parsed results page
+    """
+    # Initialize a list to store the scraped data
+    property_list = []
 
-        bedrooms = bedrooms.find_next("span").text.strip() if bedrooms else "No Bedrooms"
-        bathrooms = bathrooms.find_next("span").text.strip() if bathrooms else "No Bathrooms"
-        parking = parking.find_next("span").text.strip() if parking else "No Parking"
-        size = size_tag.text.strip() if size_tag else "No Size"
+    for prop in find_tiles(soup):
+        fields = tile_fields(prop)
 
-        # Store the scraped data in a dictionary
+        # Store the scraped data in a dictionary, with placeholders for missing fields
         property_data = {
-            "Title": title,
-            "Price": price,
-            "Location": location,
-            "Bedrooms": bedrooms,
-            "Bathrooms": bathrooms,
-            "Parking": parking,
-            "Size": size
+            "Title": fields["Title"] or "No Title",
+            "Price": fields["Price"] or "No Price",
+            "Location": fields["Location"] or "No Location",
+            "Bedrooms": fields["Bedrooms"] or "No Bedrooms",
+            "Bathrooms": fields["Bathrooms"] or "No Bathrooms",
+            "Parking": fields["Parking"] or "No Parking",
+            "Size": fields["Size"] or "No Size"
         }
 
         # Add the property data to the list
         property_list.append(property_data)
 
-else:
-    print(f"Failed to retrieve data. HTTP Status Code: {response.status_code}")
+    return property_list
+
+
+@dataclass(slots=True)
+class Listing:
+    """
+    One property listing with typed fields (None when the tile doesn't show it).
+    Bedrooms and bathrooms are floats because Property24 lists half rooms ("1.5").
+    """
+    listing_id: Optional[str]
+    area: Optional[str]
+    title: Optional[str]
+    price: Optional[int]
+    location: Optional[str]
+    bedrooms: Optional[float]
+    bathrooms: Optional[float]
+    parking: Optional[int]
+    size_m2: Optional[int]
+    url: Optional[str]
+
+    def as_record(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+# First amount in a text: either digits grouped in thousands by spaces or commas
+# ("1 250 000", "1,250,000.50") or a plain number with an optional decimal part ("120.5", "120,5")
+AMOUNT = re.compile(
+    r'(?P<grouped>\d{1,3}(?:[ \xa0\u202f,]\d{3})+(?:\.\d+)?)(?!\d)'
+    r'|(?P<plain>\d+(?:[.,]\d+)?)'
+)
+HECTARES = re.compile(r'(\d+(?:[.,]\d+)?)\s*ha\b', re.IGNORECASE)
+LISTING_ID = re.compile(r'/(\d+)/?$')
+
+
+def parse_amount(text):
+    """
+    First amount in the text as a float: "R 1 250 000" -> 1250000.0, "120.5 m²" -> 120.5.
+    For a range ("R 1 250 000 - R 2 000 000") this is the lower bound.
+    Returns None when there is no number.
+    """
+    match = AMOUNT.search(text or "")
+    if not match:
+        return None
+    if match.group("grouped"):
+        return float(re.sub(r'[ \xa0\u202f,]', '', match.group("grouped")))
+    return float(match.group("plain").replace(",", "."))
+
+
+def parse_int(text):
+    """
+    "R 1 250 000" -> 1250000, rounding any decimals. Ranges give the lower bound.
+    Returns None when there are no digits.
+    """
+    amount = parse_amount(text)
+    return int(round(amount)) if amount is not None else None
+
+
+def parse_number(text):
+    """
+    "2.5" -> 2.5, "3" -> 3.0. Returns None when there is no number.
+    """
+    match = NUMBER.search(text or "")
+    return float(match.group(0).replace(",", ".")) if match else None
+
+
+def parse_size(text):
+    """
+    Floor or erf size in square metres ("120 m²" -> 120, "120.5 m²" -> 120, "1.5 ha" -> 15000)
+    """
+    if not text:
+        return None
+    hectares = HECTARES.search(text)
+    if hectares:
+        return int(float(hectares.group(1).replace(",", ".")) * 10000)
+    return parse_int(text.replace("²", ""))
+
+
+@run_metrics.timed("extract")
+def parse_listing_records(soup, area=None, base_url=BASE_URL):
+    """
+    Parse every tile on a results page into a typed Listing
+    """
+    listings = []
+    for prop in find_tiles(soup):
+        fields = tile_fields(prop)
+        link = fields["Link"]
+        listing_id = LISTING_ID.search(link) if link else None
+        if fields["Price"] is None or fields["Title"] is None:
+            run_metrics.count("incomplete_listings")
+        listings.append(Listing(
+            listing_id=listing_id.group(1) if listing_id else None,
+            area=area,
+            title=fields["Title"],
+            price=parse_int(fields["Price"]),
+            location=fields["Location"],
+            bedrooms=parse_number(fields["Bedrooms"]),
+            bathrooms=parse_number(fields["Bathrooms"]),
+            parking=parse_int(fields["Parking"]),
+            size_m2=parse_size(fields["Size"]),
+            url=urljoin(base_url, link) if link else None,
+        ))
+    run_metrics.count("listings", len(listings))
+    return listings
+
+
+def find_last_page(soup):
+    """
+    Highest page number linked from the results pagination (1 if there is none)
+    """
+    pages = [1]
+    for link in soup.select(".pagination a[href], a[data-pagenumber]"):
+        number = link.get("data-pagenumber") or (PAGE_NUMBER.search(link["href"]) or [None, None])[1]
+        if number and str(number).isdigit():
+            pages.append(int(number))
+    return max(pages)
+
+
+def page_url(area_url, page):
+    """
+    URL of a given results page for an area, e.g. .../durban/kwazulu-natal/169/p3
+    """
+    area_url = area_url.rstrip("/")
+    return area_url if page == 1 else f"{area_url}/p{page}"
+
+
+def area_name(area_url):
+    # e.g. "durban" from https://www.property24.com/for-sale/durban/kwazulu-natal/169
+    parts = urlparse(area_url).path.strip("/").split("/")
+    return parts[1] if len(parts) > 1 else area_url
+
+
+def crawl_areas(area_urls, sink, max_workers=8, per_host=4, max_pages=None, parser_backend=None):
+    """
+    Crawl every results page of each area concurrently and stream typed
+    listings to the sink as pages are parsed. First pages are fetched first to
+    discover how many pages each area has; the remaining pages are then fetched
+    in one concurrent batch. Returns the number of listings written.
+    """
+    crawler = Crawler(
+        session=make_session(headers, pool_size=max_workers),
+        max_workers=max_workers,
+        per_host=per_host,
+        cache=default_cache(),
+    )
+
+    def write_page(page_link, html_content, area):
+        with run_metrics.stage("parse"):
+            soup = make_soup(html_content, parser_backend)
+        listings = parse_listing_records(soup, area, base_url=page_link)
+        with run_metrics.stage("save"):
+            sink.write([listing.as_record() for listing in listings])
+        return soup, len(listings)
+
+    written = 0
+    remaining = []
+    areas = {page_url(area_url, 1): area_url for area_url in area_urls}
+    try:
+        for first_page, html_content in crawler.crawl(list(areas)):
+            area_url = areas[first_page]
+            if not html_content:
+                print(f"Failed to retrieve {first_page}")
+                continue
+            soup, count = write_page(first_page, html_content, area_name(area_url))
+            written += count
+            last_page = find_last_page(soup)
+            if max_pages:
+                last_page = min(last_page, max_pages)
+            print(f"{area_name(area_url)}: {last_page} pages")
+            remaining.extend((page_url(area_url, page), area_url) for page in range(2, last_page + 1))
+
+        page_areas = dict(remaining)
+        for link, html_content in crawler.crawl(list(page_areas)):
+            if not html_content:
+                print(f"Failed to retrieve {link}")
+                continue
+            _, count = write_page(link, html_content, area_name(page_areas[link]))
+            written += count
+    finally:
+        crawler.close()
+
+    print(f"Crawled {len(areas) + len(remaining)} pages, {written} listings")
+    print(f"HTTP cache: {default_cache().stats()}")
+    return written
+
+
+def main(parser_backend=None, export_excel=True, index_path=None):
+    # Send a GET request to fetch the webpage content (served from the HTTP cache when fresh)
+    metrics = run_metrics.start_run("property24")
+    cache = default_cache()
+    run_metrics.count("fetches")
+    with metrics.stage("fetch"):
+        response = cache.get(url, headers=headers)
+    count_response(response)
+    print(f"HTTP cache: {cache.stats()}")
+
+    property_list = []
+
+    # Incremental mode: track listings across runs and report only what changed
+    index = ProductIndex(index_path) if index_path else None
+    run = index.start_run() if index else None
+    delta = Delta()
+
+    # Check if the response was successful
+    if response.status_code == 200:
+        if index and not index.page_changed(url, response.content):
+            print("Results page unchanged since the last run, nothing to parse.")
+            index.touch_source("property24", url)
+            index.close()
+            metrics.count("pages_unchanged")
+            metrics.report()
+            metrics.write_summary()
+            return
+        with metrics.stage("parse"):
+            soup = make_soup(response.content, parser_backend)
+        property_list = parse_listings(soup)
+        metrics.count("listings", len(property_list))
+        if index:
+            delta = index.update("property24", property_list, source=url)
+            index.record_page(url)
+    else:
+        print(f"Failed to retrieve data. HTTP Status Code: {response.status_code}")
+        metrics.count("fetch_errors")
+        if index:
+            # Don't report every listing as removed just because the fetch failed
+            index.touch_source("property24", url)
+
+    # Stream the listings to a Parquet (or CSV) file
+    with metrics.stage("save"), open_sink("property_listings.parquet", "property24") as sink:
+        sink.write(property_list)
+
+    print(f"Data has been saved to '{sink.path}'")
+
+    if index:
+        delta.removed = index.finish_run("property24", run)
+        save_changes(delta, "property_listings_changes.csv")
+        index.close()
+
+    # Optional export step to Excel
+    if export_excel:
+        with metrics.stage("excel_export"):
+            export_to_excel(sink.path, "property_listings.xlsx", "property24")
+
+    metrics.report()
+    metrics.write_summary()
+
 
-# Convert the list of dictionaries into a pandas DataFrame
-df = pd.DataFrame(property_list)
+def crawl_main(area_urls, path="property_listings_all.parquet", max_pages=None):
+    """
+    Crawl all results pages for a list of area URLs into one typed Parquet/CSV file
+    """
+    metrics = run_metrics.start_run("property24_crawl")
+    with open_sink(path, "property24_listings") as sink:
+        crawl_areas(area_urls, sink, max_pages=max_pages)
+    print(f"Listings saved to '{sink.path}'")
+    metrics.info["http_cache"] = default_cache().stats()
+    metrics.report()
+    metrics.write_summary()
+    return sink.path
 
-# Save the DataFrame to an Excel file
-df.to_excel("property_listings.xlsx", index=False, engine="openpyxl")
 
-print("Data has been saved to 'property_listings.xlsx'")
+if __name__ == "__main__":
+    import sys
+    # Usage: python Property24.py [area_url ...]   (no arguments: the Durban page only)
+    if len(sys.argv) > 1:
+        crawl_main(sys.argv[1:])
+    else:
+        main()
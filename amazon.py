@@ -1,75 +1,361 @@
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from urllib.parse import quote_plus
+import json
+import random
 import time
 import requests  # For exchange rate
-import pandas as pd  # For saving to Excel
 
-# Setup Selenium WebDriver
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")  # Run in headless mode (no UI)
-options.add_argument("--disable-blink-features=AutomationControlled")  # Bypass bot detection
-options.add_argument("--window-size=1920x1080")  # Set window size
-options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")  # Fake user-agent
+import run_metrics
+from driver_pool import DriverPool
+from product_index import Delta, ProductIndex, save_changes
+from sinks import open_sink, export_excel as export_to_excel
 
-# Initialize driver
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=options)
 
-# Open Amazon search results page
-search_query = "laptop"
-url = f"https://www.amazon.com/s?k={search_query}"
-driver.get(url)
+def amazon_chrome_options():
+    """
+    Setup Selenium WebDriver options for every pooled Amazon browser
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")  # Run in headless mode (no UI)
+    options.add_argument("--disable-blink-features=AutomationControlled")  # Bypass bot detection
+    options.add_argument("--window-size=1920x1080")  # Set window size
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")  # Fake user-agent
+    return options
 
-# Wait for elements to load
-time.sleep(5)
 
-# Scroll down to load more products
-driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-time.sleep(3)
+RESULT_XPATH = '//div[@data-component-type="s-search-result"]'
 
-# Get the latest USD to ZAR exchange rate
-try:
-    response = requests.get("https://api.exchangerate-api.com/v4/latest/USD")
-    exchange_rate = response.json()["rates"]["ZAR"]
-except:
-    exchange_rate = 18.50  # Fallback rate if API fails
+# Shared pool of warm browsers - borrow a driver instead of launching one per search.
+# It stays open across main() calls and is closed by the pool's atexit hook.
+driver_pool = DriverPool(amazon_chrome_options, size=1, max_pages=50)
 
-# Extract product titles and prices
-products = driver.find_elements(By.XPATH, '//div[@data-component-type="s-search-result"]')
 
-data = []  # Store scraped data
+FALLBACK_RATE = 18.50
+EXCHANGE_RATE_CACHE = "exchange_rate.json"
 
-if not products:
-    print("No products found. Amazon may have blocked the request.")
 
-for product in products[:10]:  # Get first 10 products
+def _read_cached_rate(cache_path):
     try:
-        title = product.find_element(By.XPATH, './/div[@data-cy="title-recipe"]//h2/span').text  # Fixed XPath
-    except:
-        title = "Title not found"
+        with open(cache_path) as f:
+            cached = json.load(f)
+        return float(cached["rate"]), float(cached["fetched_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, None
 
+
+def get_exchange_rate(cache_path=EXCHANGE_RATE_CACHE, ttl=6 * 3600):
+    """
+    Get the latest USD to ZAR exchange rate. The rate is cached in a small JSON
+    file for `ttl` seconds so repeated runs don't call the API each time; if
+    the API fails we use the last cached rate, then the fallback rate.
+    """
+    rate, fetched_at = _read_cached_rate(cache_path) if cache_path else (None, None)
+    if rate is not None and time.time() - fetched_at < ttl:
+        return rate
+
+    run_metrics.count("fetches")
+    try:
+        response = requests.get("https://api.exchangerate-api.com/v4/latest/USD", timeout=10)
+        fresh_rate = float(response.json()["rates"]["ZAR"])
+    except Exception:
+        run_metrics.count("fetch_errors")
+        if rate is not None:
+            print(f"Exchange rate API failed, using the cached rate {rate}")
+            return rate
+        return FALLBACK_RATE  # Fallback rate if API fails
+
+    if cache_path:
+        with open(cache_path, "w") as f:
+            json.dump({"rate": fresh_rate, "fetched_at": time.time()}, f)
+    return fresh_rate
+
+
+def wait_for_results(driver, timeout=10):
+    """
+    Wait until search results are present instead of sleeping a fixed time.
+    Returns False if the page never showed any results.
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, RESULT_XPATH))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def scroll_to_bottom(driver, timeout=1, max_scrolls=5):
+    """
+    Scroll down until the page stops growing, to load lazy/infinite-scroll products
+    """
+    for _ in range(max_scrolls):
+        height = driver.execute_script("return document.body.scrollHeight")
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        try:
+            WebDriverWait(driver, timeout).until(
+                lambda d: d.execute_script("return document.body.scrollHeight") > height
+            )
+        except TimeoutException:
+            break  # Nothing more was loaded
+
+
+def product_title(product):
+    """
+    Title of one search result element, or None
+    """
+    try:
+        return product.find_element(By.XPATH, './/div[@data-cy="title-recipe"]//h2/span').text  # Fixed XPath
+    except NoSuchElementException:
+        run_metrics.count("parse_failures")
+        return None
+
+
+def product_price_usd(product):
+    """
+    Price of one search result element in USD as a float, or None
+    """
     try:
         price_whole = product.find_element(By.XPATH, './/span[contains(@class, "a-price-whole")]').text
         price_fraction = product.find_element(By.XPATH, './/span[contains(@class, "a-price-fraction")]').text
-        price_usd = float(f"{price_whole}.{price_fraction}")  # Convert to float
+        return float(f"{price_whole.replace(',', '')}.{price_fraction}")  # Convert to float
+    except (NoSuchElementException, ValueError):
+        run_metrics.count("missing_prices")
+        return None
+
+
+def parse_product(product, exchange_rate):
+    """
+    Extract the title and price of one search result element
+    """
+    title = product_title(product) or "Title not found"
+    price_usd = product_price_usd(product)
+    if price_usd is None:
+        price_display = "Price not found"
+    else:
         price_zar = round(price_usd * exchange_rate, 2)  # Convert to ZAR
         price_display = f"${price_usd} (~R{price_zar})"
-    except:
-        price_display = "Price not found"
 
-    # Store data in list
-    data.append([title, price_display])
+    return {"Title": title, "Price (USD & ZAR)": price_display}
+
+
+def parse_product_record(product, exchange_rate):
+    """
+    Extract one search result as a typed record with numeric USD and ZAR prices
+    """
+    price_usd = product_price_usd(product)
+    return {
+        "asin": product.get_attribute("data-asin") or None,
+        "title": product_title(product),
+        "price_usd": price_usd,
+        "price_zar": round(price_usd * exchange_rate, 2) if price_usd is not None else None,
+    }
+
+
+def has_next_page(driver):
+    """
+    Check whether the results pagination has an enabled "Next" link
+    """
+    return bool(driver.find_elements(By.CSS_SELECTOR, "a.s-pagination-next"))
+
+
+def iter_search_pages(driver, search_query, exchange_rate, max_pages=20, parser=parse_product):
+    """
+    Walk the result pages for a query and yield the products of each page as a
+    list, each one parsed with parser(element, exchange_rate)
+    """
+    for page in range(1, max_pages + 1):
+        url = f"https://www.amazon.com/s?k={quote_plus(search_query)}&page={page}"
+        run_metrics.count("fetches")
+        with run_metrics.stage("page_load"):
+            driver.get(url)
+
+        with run_metrics.stage("wait"):
+            found = wait_for_results(driver)
+        if not found:
+            run_metrics.count("wait_timeouts")
+            if page == 1:
+                print("No products found. Amazon may have blocked the request.")
+            break
+
+        with run_metrics.stage("scroll"):
+            scroll_to_bottom(driver)
+
+        with run_metrics.stage("extract"):
+            products = driver.find_elements(By.XPATH, RESULT_XPATH)
+            rows = [parser(product, exchange_rate) for product in products]
+        print(f"Page {page}: {len(products)} products")
+        run_metrics.count("products", len(rows))
+        yield rows
+
+        if not has_next_page(driver):
+            break
+
+
+def iter_products(driver, search_query, exchange_rate, max_pages=20):
+    """
+    Yield products one by one across all result pages
+    """
+    for page_rows in iter_search_pages(driver, search_query, exchange_rate, max_pages):
+        yield from page_rows
+
+
+def scrape_search(driver, search_query, exchange_rate, limit=10):
+    """
+    Scrape titles and prices from the first Amazon search results page
+    """
+    return list(islice(iter_products(driver, search_query, exchange_rate, max_pages=1), limit))
+
+
+def save_pages_incrementally(pages, file_name, flush_every_page=True, index=None, source=None):
+    """
+    Stream each page of rows to the output sink as soon as it is scraped, so
+    memory stays flat and a crash keeps everything collected so far.
+    With a ProductIndex, each page is also compared with the previous run.
+    Returns (path written, Delta or None).
+    """
+    delta = Delta() if index is not None else None
+    with open_sink(file_name, "amazon") as sink:
+        for rows in pages:
+            with run_metrics.stage("save"):
+                sink.write(rows)
+                if flush_every_page:
+                    sink.flush()
+            if index is not None:
+                delta.extend(index.update("amazon", rows, source=source))
+    print(f"{sink.rows_written} products saved to {sink.path}")
+    return sink.path, delta
+
+
+def scrape_query(pool, search_query, exchange_rate, max_pages=1, min_delay=1.0, max_delay=3.0):
+    """
+    Scrape the result pages of one query on a driver borrowed from the pool and
+    return typed records. A random delay before each query keeps several
+    browsers from hitting Amazon in lockstep.
+    """
+    time.sleep(random.uniform(min_delay, max_delay))
+    records = []
+    with pool.borrow() as driver:
+        pages = iter_search_pages(driver, search_query, exchange_rate, max_pages, parser=parse_product_record)
+        for page, rows in enumerate(pages, 1):
+            for row in rows:
+                row["query"] = search_query
+                row["page"] = page
+            records.extend(rows)
+    return records
+
+
+def scrape_queries(queries, path="Amazon_Products_all.parquet", workers=3, max_pages=1,
+                   min_delay=1.0, max_delay=3.0):
+    """
+    Scrape many search queries concurrently across a small pool of browsers,
+    with one exchange-rate lookup for the whole run, and stream the typed
+    records of every query into one Parquet (or CSV) table.
+    Returns (path written, list of queries that failed).
+    """
+    exchange_rate = get_exchange_rate()
+    print(f"Scraping {len(queries)} queries with {workers} browsers (USD/ZAR {exchange_rate})")
+
+    pool = DriverPool(amazon_chrome_options, size=workers, max_pages=50)
+    failed = []
+    try:
+        with open_sink(path, "amazon_products") as sink, ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(scrape_query, pool, query, exchange_rate, max_pages, min_delay, max_delay): query
+                for query in queries
+            }
+            # Write in this thread as each query finishes; the sink isn't thread safe
+            for done, future in enumerate(as_completed(futures), 1):
+                query = futures[future]
+                try:
+                    records = future.result()
+                except Exception as e:
+                    run_metrics.count("query_errors")
+                    print(f"[{done}/{len(queries)}] {query!r} failed: {e}")
+                    failed.append(query)
+                    continue
+                with run_metrics.stage("save"):
+                    sink.write(records)
+                run_metrics.count("queries")
+                print(f"[{done}/{len(queries)}] {query!r}: {len(records)} products")
+    finally:
+        pool.close()
+
+    print(f"{sink.rows_written} products from {len(queries) - len(failed)} queries saved to {sink.path}")
+    return sink.path, failed
+
+
+def read_queries(path):
+    """
+    One search query per line; blank lines and lines starting with # are ignored
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def queries_main(queries_path, max_pages=1, workers=3, export_excel=False):
+    metrics = run_metrics.start_run("amazon_queries")
+    queries = read_queries(queries_path)
+    metrics.info["queries"] = len(queries)
+    path, failed = scrape_queries(queries, workers=workers, max_pages=max_pages)
+    metrics.info["failed_queries"] = failed
+
+    if export_excel:
+        with metrics.stage("excel_export"):
+            export_to_excel(path, "Amazon_Products_all.xlsx", "amazon_products")
+
+    metrics.report()
+    metrics.write_summary()
+    return path
+
+
+def main(search_query="laptop", max_pages=None, export_excel=True, index_path=None):
+    metrics = run_metrics.start_run("amazon")
+    metrics.info["query"] = search_query
+    with metrics.stage("exchange_rate"):
+        exchange_rate = get_exchange_rate()
+
+    # Incremental mode: track products across runs and report only what changed
+    index = ProductIndex(index_path) if index_path else None
+    run = index.start_run() if index else None
+
+    with driver_pool.borrow() as driver:
+        if max_pages:
+            # Paginated mode: stream every result page to the sink
+            pages = iter_search_pages(driver, search_query, exchange_rate, max_pages)
+        else:
+            pages = [scrape_search(driver, search_query, exchange_rate)]
+        path, delta = save_pages_incrementally(pages, "Amazon_Products.parquet", index=index, source=search_query)
+
+    if index:
+        delta.removed = index.finish_run("amazon", run)
+        save_changes(delta, "Amazon_Products_changes.csv")
+        index.close()
 
-# Close driver
-driver.quit()
+    # Optional export step to Excel
+    if export_excel:
+        with metrics.stage("excel_export"):
+            export_to_excel(path, "Amazon_Products.xlsx", "amazon")
 
-# Convert data to DataFrame
-df = pd.DataFrame(data, columns=["Title", "Price (USD & ZAR)"])
+    print(f"✅ Data successfully saved to {path}")
+    metrics.report()
+    metrics.write_summary()
 
-# Save to Excel file
-file_name = "Amazon_Products.xlsx"
-df.to_excel(file_name, index=False)
 
-print(f"✅ Data successfully saved to {file_name}")
+if __name__ == "__main__":
+    import sys
+    # Usage: python amazon.py [query] [max_pages]
+    #        python amazon.py -f queries.txt [max_pages] [browsers]
+    if len(sys.argv) > 2 and sys.argv[1] == "-f":
+        pages = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+        browsers = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+        queries_main(sys.argv[2], pages, browsers)
+    else:
+        query = sys.argv[1] if len(sys.argv) > 1 else "laptop"
+        pages = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        main(query, pages)
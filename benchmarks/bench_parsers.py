@@ -0,0 +1,118 @@
+"""
+Benchmark the HTML parser backends on saved pages.
+
+Parses the same pages with every installed backend, runs the site's
+extraction code on top of each tree and reports parse and extraction time,
+plus whether each backend found the same products as html.parser.
+
+Usage:
+    python -m benchmarks.bench_parsers --site makro saved/makro_*.html
+    python -m benchmarks.bench_parsers --site property24 saved/p24_*.html --repeat 10
+    python -m benchmarks.bench_parsers --site makro     # offline corpus from benchmarks.corpus
+"""
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+from importlib.util import find_spec
+
+import Makro
+import Property24
+from benchmarks.corpus import corpus
+from html_parsers import available_backends, make_soup
+
+
+def extract_makro(soup):
+    results = []
+    for container in Makro.find_products(soup):
+        results.append(Makro.extract_product_data(container))
+    return results
+
+
+def extract_property24(soup):
+    return Property24.parse_listings(soup)
+
+
+EXTRACTORS = {
+    "makro": extract_makro,
+    "property24": extract_property24,
+}
+
+
+def time_backend(pages, backend, extract, repeat):
+    """
+    Return (parse seconds, extract seconds, extracted results) for one backend
+    """
+    parse_time = 0.0
+    extract_time = 0.0
+    results = []
+    for _ in range(repeat):
+        results = []
+        for html_content in pages:
+            start = time.perf_counter()
+            soup = make_soup(html_content, backend)
+            parse_time += time.perf_counter() - start
+
+            # Keep the scrapers' progress prints out of the timings
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                results.append(extract(soup))
+                extract_time += time.perf_counter() - start
+    return parse_time / repeat, extract_time / repeat, results
+
+
+def time_selectolax(pages, repeat):
+    """
+    Raw lexbor parse time, for reference only - the extraction code needs a BeautifulSoup tree
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html_content in pages:
+            LexborHTMLParser(html_content)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(pages, site, repeat):
+    extract = EXTRACTORS[site]
+    size_mb = sum(len(p) for p in pages) / 1e6
+    print(f"{len(pages)} pages, {size_mb:.1f} MB, {repeat} repeats, site={site}\n")
+    print(f"{'backend':<14}{'parse s':>10}{'extract s':>11}{'pages/s':>10}  same output")
+
+    # html.parser always runs first, so every other backend is compared against it
+    backends = ["html.parser"] + [name for name in available_backends() if name != "html.parser"]
+    baseline = None
+    for backend in backends:
+        parse_s, extract_s, results = time_backend(pages, backend, extract, repeat)
+        if baseline is None:
+            baseline = results
+        same = "yes" if results == baseline else "NO"
+        pages_per_s = len(pages) / parse_s if parse_s else float("inf")
+        print(f"{backend:<14}{parse_s:>10.3f}{extract_s:>11.3f}{pages_per_s:>10.1f}  {same}")
+
+    if find_spec("selectolax") is not None:
+        parse_s = time_selectolax(pages, repeat)
+        pages_per_s = len(pages) / parse_s if parse_s else float("inf")
+        print(f"{'lexbor (raw)':<14}{parse_s:>10.3f}{'-':>11}{pages_per_s:>10.1f}  n/a")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="saved HTML pages (default: the offline corpus)")
+    parser.add_argument("--site", choices=sorted(EXTRACTORS), default="makro")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    if not pages:
+        pages = [html_content.encode() if isinstance(html_content, str) else html_content
+                 for html_content in corpus(args.site, ["small", "medium", "large"]).values()]
+    run(pages, args.site, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Offline recall/latency benchmark for the router's retrieval path.
+
+Loads and splits the documents like the notebook, embeds the chunks through
+the persistent embedding cache (only the first run pays for it) and
+compares, on the notebook's sample questions:
+  - dense exact   (brute-force cosine scan, what vector_index.as_query_engine() does)
+  - dense hnsw    (router_retrieval.DenseIndex, when hnswlib is installed)
+  - bm25          (router_retrieval.BM25Index)
+  - hybrid        (router_retrieval.HybridRetriever, relative-score and RRF fusion)
+
+Recall@k counts a question as answered if one of its top-k chunks contains
+one of the question's label phrases. HNSW is also scored against the exact
+scan (ANN recall). Latencies are per query and exclude the query embedding,
+which is the same for every method. --scale pads the dense index with
+random vectors to show how exact and HNSW search grow with the corpus.
+
+Usage:
+    python -m benchmarks.bench_retrieval --files metagpt.pdf
+    python -m benchmarks.bench_retrieval --files metagpt.pdf --top-k 3 --scale 10000 100000
+    python -m benchmarks.bench_retrieval --questions questions.json --json results.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from router_retrieval import BM25Index, DenseIndex, HybridRetriever, hnswlib_available, node_embeddings
+
+# The notebook's sample questions for the vector tool, with phrases that mark a relevant chunk
+DEFAULT_QUESTIONS = {
+    "How do agents share information with other agents?": ["shared message pool", "publish-subscribe", "subscription"],
+    "Tell me about the ablation study results?": ["ablation"],
+}
+
+
+def is_relevant(node, phrases):
+    text = node.get_content().lower()
+    return any(phrase.lower() in text for phrase in phrases)
+
+
+def timed(func, repeat):
+    """
+    Mean seconds per call of func over `repeat` calls, and its last result
+    """
+    result = func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def run(nodes, embed_model, questions, top_k=2, repeat=20, candidates=20):
+    vectors = node_embeddings(nodes, embed_model)
+    query_vectors = {q: embed_model.get_query_embedding(q) for q in questions}
+
+    bm25 = BM25Index.build(nodes)
+    exact = DenseIndex(vectors, use_hnsw=False)
+    methods = {
+        "dense exact": lambda q: exact.top_k(query_vectors[q], top_k)[0],
+        "bm25": lambda q: bm25.top_k(q, top_k)[0],
+    }
+    hnsw = None
+    if hnswlib_available:
+        hnsw = DenseIndex(vectors, use_hnsw=True)
+        methods["dense hnsw"] = lambda q: hnsw.top_k(query_vectors[q], top_k)[0]
+    positions = {node.node_id: i for i, node in enumerate(nodes)}
+    for fusion in ("relative", "rrf"):
+        retriever = HybridRetriever(nodes, embed_model, bm25, hnsw or exact, similarity_top_k=top_k,
+                                    candidates=candidates, fusion=fusion)
+        methods[f"hybrid {fusion}"] = (
+            lambda q, r=retriever: [positions[n.node.node_id] for n in r._rank(q, query_vectors[q])]
+        )
+
+    results = []
+    print(f"{len(nodes)} chunks, {len(questions)} questions, top-k {top_k}")
+    print(f"{'method':<18}{'recall@k':>10}{'ann recall':>12}{'ms/query':>10}")
+    for method, search in methods.items():
+        hits, ann_overlap, seconds = 0, [], 0.0
+        for question, phrases in questions.items():
+            elapsed, found = timed(lambda: search(question), repeat)
+            seconds += elapsed
+            hits += any(is_relevant(nodes[i], phrases) for i in found)
+            if method == "dense hnsw":
+                reference = set(exact.top_k(query_vectors[question], top_k)[0].tolist())
+                ann_overlap.append(len(reference & set(np.asarray(found).tolist())) / max(len(reference), 1))
+        recall = hits / len(questions)
+        ann_recall = float(np.mean(ann_overlap)) if ann_overlap else None
+        ms = seconds / len(questions) * 1000
+        ann_text = f"{ann_recall:>12.2f}" if ann_recall is not None else f"{'-':>12}"
+        print(f"{method:<18}{recall:>10.2f}{ann_text}{ms:>10.3f}")
+        results.append({"method": method, "recall": recall, "ann_recall": ann_recall, "ms_per_query": ms})
+    return results, np.asarray(vectors, dtype=np.float32), list(query_vectors.values())
+
+
+def run_scaling(vectors, query_vectors, scales, top_k=2, repeat=20, seed=0):
+    """
+    Pad the real chunk vectors with random unit vectors and compare exact and HNSW search
+    """
+    if not hnswlib_available:
+        print("\nhnswlib not installed; skipping the scaling comparison")
+        return []
+    rng = np.random.default_rng(seed)
+    results = []
+    print(f"\n{'vectors':>10}{'exact ms':>10}{'hnsw ms':>10}{'ann recall':>12}{'build s':>9}")
+    for scale in scales:
+        padding = rng.standard_normal((scale, vectors.shape[1])).astype(np.float32)
+        padded = np.vstack([vectors, padding])
+        exact = DenseIndex(padded, use_hnsw=False)
+        start = time.perf_counter()
+        hnsw = DenseIndex(padded, use_hnsw=True)
+        build_seconds = time.perf_counter() - start
+
+        exact_s = np.mean([timed(lambda: exact.top_k(q, top_k), repeat)[0] for q in query_vectors])
+        hnsw_s = np.mean([timed(lambda: hnsw.top_k(q, top_k), repeat)[0] for q in query_vectors])
+        overlap = np.mean([
+            len(set(exact.top_k(q, top_k)[0].tolist()) & set(hnsw.top_k(q, top_k)[0].tolist())) / top_k
+            for q in query_vectors
+        ])
+        print(f"{len(padded):>10}{exact_s * 1000:>10.3f}{hnsw_s * 1000:>10.3f}{overlap:>12.2f}{build_seconds:>9.1f}")
+        results.append({
+            "vectors": len(padded),
+            "exact_ms": exact_s * 1000,
+            "hnsw_ms": hnsw_s * 1000,
+            "ann_recall": float(overlap),
+            "build_s": build_seconds,
+        })
+    return results
+
+
+def load_nodes(files, chunk_size=1024):
+    from llama_index.core import SimpleDirectoryReader
+    from llama_index.core.node_parser import SentenceSplitter
+
+    documents = SimpleDirectoryReader(input_files=files).load_data()
+    return SentenceSplitter(chunk_size=chunk_size).get_nodes_from_documents(documents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", nargs="+", default=["metagpt.pdf"])
+    parser.add_argument("--model", default="intfloat/multilingual-e5-large")
+    parser.add_argument("--cache", default="storage/embeddings.sqlite", help="embedding cache shared with the notebook")
+    parser.add_argument("--questions", help='JSON file of {"question": ["relevant phrase", ...]}')
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--candidates", type=int, default=20, help="candidates per side before fusion")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", nargs="*", type=int, default=[], help="padded dense index sizes to time")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    from router_embeddings import CachedEmbedding
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            questions = json.load(f)
+
+    nodes = load_nodes(args.files, args.chunk_size)
+    embed_model = CachedEmbedding(HuggingFaceEmbedding(model_name=args.model), cache_path=args.cache)
+    results, vectors, query_vectors = run(nodes, embed_model, questions, args.top_k, args.repeat, args.candidates)
+    scaling = run_scaling(vectors, query_vectors, args.scale, args.top_k, args.repeat)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"methods": results, "scaling": scaling}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Offline throughput and memory benchmark for the scraper parsing paths.
+
+Measures, per corpus page:
+  - find_products           (Makro container selection)
+  - extract_product_data    (Makro name/price extraction, per container)
+  - is_perfume_product      (Makro category filter, per name)
+  - classify categories     (Makro multi-category classifier, whole batch)
+  - parse_listings          (Property24 tile parser)
+
+and reports pages/s, items/s and peak traced memory. No network access is
+needed; pages come from benchmarks.corpus.
+
+Usage:
+    python -m benchmarks.bench_scrapers
+    python -m benchmarks.bench_scrapers --sizes small medium --repeat 5 --json results.json
+"""
+import argparse
+import io
+import json
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import Makro
+import Property24
+from benchmarks.corpus import SIZES, corpus
+from html_parsers import make_soup
+
+
+def measure(func, repeat):
+    """
+    Run func `repeat` times. Returns (mean seconds, peak bytes, last result).
+    Timing and memory are measured in separate runs so tracing doesn't skew the timings.
+    """
+    with redirect_stdout(io.StringIO()):
+        result = func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        elapsed = (time.perf_counter() - start) / repeat
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def bench_makro(html_content, repeat, backend):
+    soup = make_soup(html_content, backend)
+    rows = []
+
+    seconds, peak, containers = measure(lambda: Makro.find_products(soup), repeat)
+    rows.append(("find_products", seconds, peak, len(containers)))
+
+    seconds, peak, extracted = measure(
+        lambda: [Makro.extract_product_data(c) for c in containers], repeat
+    )
+    rows.append(("extract_product_data", seconds, peak, len(containers)))
+
+    names = [name for name, _ in extracted if name]
+    seconds, peak, _ = measure(lambda: [Makro.is_perfume_product(n) for n in names], repeat)
+    rows.append(("is_perfume_product", seconds, peak, len(names)))
+
+    seconds, peak, _ = measure(lambda: Makro.category_classifier.classify(names), repeat)
+    rows.append(("classify categories", seconds, peak, len(names)))
+
+    seconds, peak, products = measure(lambda: Makro.parse_products(html_content, backend), repeat)
+    rows.append(("parse_products (end to end)", seconds, peak, len(products)))
+    return rows
+
+
+def bench_property24(html_content, repeat, backend):
+    rows = []
+    soup = make_soup(html_content, backend)
+    seconds, peak, listings = measure(lambda: Property24.parse_listings(soup), repeat)
+    rows.append(("parse_listings", seconds, peak, len(listings)))
+
+    seconds, peak, listings = measure(
+        lambda: Property24.parse_listings(make_soup(html_content, backend)), repeat
+    )
+    rows.append(("parse + parse_listings", seconds, peak, len(listings)))
+    return rows
+
+
+BENCHES = {
+    "makro": bench_makro,
+    "property24": bench_property24,
+}
+
+
+def run(sites, sizes, repeat, backend=None):
+    results = []
+    print(f"{'site':<11}{'page':<22}{'function':<30}{'pages/s':>10}{'items/s':>12}{'items':>8}{'peak MB':>9}")
+    for site in sites:
+        for label, html_content in corpus(site, sizes).items():
+            for function, seconds, peak, items in BENCHES[site](html_content, repeat, backend):
+                pages_per_s = 1 / seconds if seconds else float("inf")
+                items_per_s = items / seconds if seconds else float("inf")
+                print(
+                    f"{site:<11}{label:<22}{function:<30}{pages_per_s:>10.2f}"
+                    f"{items_per_s:>12.0f}{items:>8}{peak / 1e6:>9.1f}"
+                )
+                results.append({
+                    "site": site,
+                    "page": label,
+                    "function": function,
+                    "seconds": seconds,
+                    "pages_per_s": pages_per_s,
+                    "items_per_s": items_per_s,
+                    "items": items,
+                    "peak_bytes": peak,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", nargs="+", choices=sorted(BENCHES), default=sorted(BENCHES))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", help="HTML parser backend (default: fastest installed)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.sites, args.sizes, args.repeat, args.backend)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Offline HTML corpus for the scraper benchmarks.
+
+Pages come from two places:
+  - saved pages in benchmarks/pages/<site>/*.html, if any have been saved
+  - synthetic pages generated here, from a few tiles up to 10k+ tiles
+
+The synthetic pages mimic the markup the scrapers look for (the Makro
+product selectors and the Property24 p24_regularTile layout) and are
+generated from a fixed seed, so runs are comparable.
+"""
+import os
+import random
+from glob import glob
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+SIZES = {
+    "small": 24,
+    "medium": 500,
+    "large": 2500,
+    "xlarge": 10000,
+}
+
+BRANDS = ["Calvin Klein", "Hugo Boss", "Versace", "Davidoff", "Gucci", "Lacoste", "Samsung", "Defy", "Bic", "Huggies"]
+PERFUME_NAMES = ["Eau de Toilette", "Eau de Parfum", "Cologne", "Body Spray", "Fragrance Mist", "Bakhoor"]
+OTHER_NAMES = ["Kettle 1.7L", "Washing Machine", "Ballpoint Pens 10 Pack", "Nappies Size 4", "LED TV 55\"", "Toaster"]
+
+# Different container markups seen on Makro pages over time
+MAKRO_TILES = [
+    '<div class="product-item"><h3 class="product-name">{name}</h3><span class="price">{price}</span></div>',
+    '<li class="product"><a title="{name}" href="#">{name}</a><div class="product-price">{price}</div></li>',
+    '<div class="ProductCard_root"><span class="ProductCard_name">{name}</span><span class="ProductCard_price">{price}</span></div>',
+    '<div class="product-card"><div class="details"><h2>{name}</h2></div><p>Now only {price}</p></div>',
+]
+
+# "_" stands for a space thousands separator ("R 1 299.00"), filled in by _makro_tile
+MAKRO_PRICE_FORMATS = ["R {:.2f}", "R{:.2f}", "R {:,.2f}", "R {:.0f}", "R {:_.2f}"]
+
+AREAS = ["Umhlanga", "Morningside", "Berea", "Musgrave", "Glenwood", "Durban North", "Westville", "Ballito"]
+PROPERTY_TYPES = ["House", "Apartment", "Townhouse", "Vacant Land", "Penthouse"]
+
+
+def _makro_tile(rng):
+    if rng.random() < 0.6:
+        name = f"{rng.choice(BRANDS)} {rng.choice(PERFUME_NAMES)} - {rng.choice([30, 50, 100, 125, 200])}ml"
+    else:
+        name = f"{rng.choice(BRANDS)} {rng.choice(OTHER_NAMES)}"
+    price = rng.choice(MAKRO_PRICE_FORMATS).format(rng.uniform(49, 9999)).replace("_", " ")
+    return rng.choice(MAKRO_TILES).format(name=name, price=price)
+
+
+def makro_page(n_products, seed=0):
+    """
+    Build a synthetic Makro search results page with n_products tiles
+    """
+    rng = random.Random(seed)
+    tiles = "\n".join(_makro_tile(rng) for _ in range(n_products))
+    return (
+        "<html><head><title>Search | Makro</title></head><body>"
+        '<header><nav class="menu"><a href="/">Home</a></nav></header>'
+        f'<main><div class="product-grid">\n{tiles}\n</div></main>'
+        "<footer>Makro South Africa</footer></body></html>"
+    )
+
+
+def _p24_tile(rng):
+    features = []
+    for title in ("Bedrooms", "Bathrooms", "Parking Spaces"):
+        if rng.random() < 0.9:
+            features.append(
+                f'<span class="p24_featureDetails" title="{title}"><i class="icon"></i>'
+                f"<span>{rng.randint(1, 5)}</span></span>"
+            )
+    size = f'<span class="p24_size"><span>{rng.randint(40, 900)} m²</span></span>' if rng.random() < 0.8 else ""
+    price = f"R {rng.randint(300, 25000) * 1000:,}".replace(",", " ")
+    return (
+        '<div class="p24_regularTile js_rollover_container"><div class="p24_content">'
+        f'<span class="p24_price">{price}</span>'
+        f'<span class="p24_title">{rng.randint(1, 5)} Bedroom {rng.choice(PROPERTY_TYPES)}</span>'
+        f'<span class="p24_location">{rng.choice(AREAS)}</span>'
+        f'<div class="p24_icons">{"".join(features)}{size}</div>'
+        "</div></div>"
+    )
+
+
+def property24_page(n_listings, seed=0):
+    """
+    Build a synthetic Property24 results page with n_listings tiles
+    """
+    rng = random.Random(seed)
+    tiles = "\n".join(_p24_tile(rng) for _ in range(n_listings))
+    return (
+        "<html><head><title>Property for sale in Durban</title></head><body>"
+        f'<div class="p24_results">\n{tiles}\n</div>'
+        "</body></html>"
+    )
+
+
+GENERATORS = {
+    "makro": makro_page,
+    "property24": property24_page,
+}
+
+
+def saved_pages(site):
+    """
+    Load saved pages for a site from benchmarks/pages/<site>/
+    """
+    pages = {}
+    for path in sorted(glob(os.path.join(PAGES_DIR, site, "*.html"))):
+        with open(path, "rb") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def corpus(site, sizes=None):
+    """
+    Return {label: html} for a site: saved pages first, then synthetic ones
+    """
+    pages = saved_pages(site)
+    for label in sizes or SIZES:
+        pages[f"synthetic-{label}"] = GENERATORS[site](SIZES[label])
+    return pages
@@ -0,0 +1,124 @@
+import json
+import re
+
+import pandas as pd
+
+
+def load_taxonomy(path):
+    """
+    Load a taxonomy from a JSON file: {"category": ["keyword", ...], ...}
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class KeywordClassifier:
+    """
+    Sort product names into categories by keyword, in one pass per name.
+
+    All keywords of all categories are compiled once into a single regex, so
+    classifying a name costs one scan no matter how many categories there
+    are. The scan is overlapping: every keyword occurrence counts, so
+    "body spray" reports both the "body spray" and the "spray" categories.
+    Names are lowercased before matching (much faster than re.IGNORECASE).
+    Keywords match anywhere in the name (like `keyword in name.lower()`)
+    unless word_boundaries=True.
+    Categories are reported in taxonomy order, so the first one is the
+    primary category.
+
+        classifier = KeywordClassifier({"perfume": ["perfume", "eau de"], "haircare": ["shampoo"]})
+        classifier.categories("Hugo Boss Eau de Toilette")   # ["perfume"]
+        classifier.category_matrix(df["Name"])              # one boolean column per category
+    """
+
+    def __init__(self, taxonomy, word_boundaries=False):
+        self.taxonomy = {category: list(keywords) for category, keywords in taxonomy.items()}
+        self.category_names = list(self.taxonomy)
+        self._order = {category: i for i, category in enumerate(self.category_names)}
+
+        # keyword -> categories it belongs to (a keyword may be in several)
+        self._keyword_categories = {}
+        for category, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword.lower(), []).append(category)
+
+        # Longest keywords first, so the longest keyword starting at each position is found
+        alternatives = "|".join(
+            re.escape(keyword) for keyword in sorted(self._keyword_categories, key=len, reverse=True)
+        )
+        if word_boundaries:
+            alternatives = rf"\b(?:{alternatives})\b"
+        else:
+            alternatives = f"(?:{alternatives})"
+        # Plain pattern for "any keyword?" checks
+        self.pattern = re.compile(alternatives)
+        # Zero-width lookahead tried at every position, so matches may overlap
+        self.overlapping_pattern = re.compile(f"(?=({alternatives}))")
+
+        # Only the longest keyword starting at a position is returned, so a
+        # keyword also stands for the shorter keywords it starts with
+        # ("eau de parfum" -> "eau de")
+        self._match_categories = {}
+        for keyword in self._keyword_categories:
+            self._match_categories[keyword] = [
+                category
+                for other, categories in self._keyword_categories.items()
+                if keyword.startswith(other) and (
+                    not word_boundaries or len(other) == len(keyword) or not keyword[len(other)].isalnum()
+                )
+                for category in categories
+            ]
+
+        # Category sets for each combination of matched keywords seen so far
+        self._combinations = {}
+
+    def _categories_of(self, keywords):
+        key = frozenset(keywords)
+        if key not in self._combinations:
+            found = {category for keyword in key for category in self._match_categories[keyword]}
+            self._combinations[key] = tuple(sorted(found, key=self._order.__getitem__))
+        return self._combinations[key]
+
+    def matches(self, text):
+        """
+        True if the text contains any keyword of the taxonomy
+        """
+        return bool(text) and self.pattern.search(text.lower()) is not None
+
+    def categories(self, text):
+        """
+        All categories whose keywords appear in the text, in taxonomy order
+        """
+        if not text:
+            return []
+        return list(self._categories_of(self.overlapping_pattern.findall(text.lower())))
+
+    def classify(self, texts):
+        """
+        Categories for a whole batch of texts
+        """
+        return [self.categories(text) for text in texts]
+
+    def category_matrix(self, names):
+        """
+        Vectorised classification of a pandas Series of names: a DataFrame with
+        one boolean column per category, indexed like the Series
+        """
+        found = names.fillna("").astype(str).str.lower().str.findall(self.overlapping_pattern)
+        categories = [self._categories_of(keywords) for keywords in found]
+        return pd.DataFrame(
+            {category: [category in row for row in categories] for category in self.category_names},
+            index=names.index,
+            dtype=bool,
+        )
+
+    def label(self, names):
+        """
+        Primary (first in taxonomy order) category of each name in a Series, or None
+        """
+        found = names.fillna("").astype(str).str.lower().str.findall(self.overlapping_pattern)
+        return pd.Series(
+            [row[0] if row else None for row in map(self._categories_of, found)],
+            index=names.index,
+            dtype=object,
+        )
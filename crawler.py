@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import run_metrics
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+}
+
+
+def make_session(headers=None, pool_size=10, retries=2):
+    """
+    Create a requests Session with a connection pool and retry on transient errors
+    """
+    session = requests.Session()
+    session.headers.update(headers or DEFAULT_HEADERS)
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def count_response(response):
+    """
+    Record cache hits and the retries urllib3 made for a response in the current run metrics
+    """
+    if getattr(response, "from_cache", False):
+        run_metrics.count("cache_hits")
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    if retries is not None and retries.history:
+        run_metrics.count("retries", len(retries.history))
+
+
+class Crawler:
+    """
+    Fetch many URLs concurrently on a bounded thread pool.
+
+    Each host gets at most `per_host` requests in flight, and requests to the
+    same host are spaced by a random delay between `min_delay` and `max_delay`
+    seconds so we stay polite to the site.
+    """
+
+    def __init__(self, session=None, max_workers=8, per_host=2, min_delay=0.5, max_delay=1.5, timeout=20, cache=None):
+        self.session = session or make_session(pool_size=max_workers)
+        self.cache = cache
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._next_allowed = {}
+
+    def _host_semaphore(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _wait_politely(self, host):
+        """
+        Reserve the next request slot for this host and sleep until it arrives
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = start + random.uniform(self.min_delay, self.max_delay)
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def fetch(self, url):
+        """
+        Fetch one URL, honouring the per-host limits. Returns the body or None.
+        Fresh responses in the HTTP cache skip the limits and the network entirely.
+        """
+        if self.cache is not None and self.cache.is_fresh(url):
+            return self._get(url)
+
+        host = urlparse(url).netloc
+        with self._host_semaphore(host):
+            self._wait_politely(host)
+            return self._get(url)
+
+    def _get(self, url):
+        run_metrics.count("fetches")
+        try:
+            with run_metrics.stage("fetch"):
+                if self.cache is not None:
+                    response = self.cache.get(url, session=self.session, timeout=self.timeout)
+                else:
+                    response = self.session.get(url, timeout=self.timeout)
+            count_response(response)
+            response.raise_for_status()
+            return response.content
+        except requests.exceptions.RequestException as e:
+            run_metrics.count("fetch_errors")
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    def crawl(self, urls):
+        """
+        Fetch all URLs concurrently and yield (url, content) as each one finishes
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in urls}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,177 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+
+import run_metrics
+
+
+class DriverPool:
+    """
+    A fixed-size pool of warm headless Chrome browsers.
+
+    Scrapers borrow a driver with `with pool.borrow() as driver:` instead of
+    launching their own. Drivers are started lazily, health-checked before they
+    are handed out, and recycled after `max_pages` page loads (driver.get
+    calls, however many happen in one borrow) or when the code using them raises.
+    """
+
+    def __init__(self, options_factory, size=2, max_pages=50, acquire_timeout=None):
+        self.options_factory = options_factory
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._service_path = None
+        self._service_resolved = False
+        self._closed = False
+
+        atexit.register(self.close)
+
+    def _resolve_service_path(self):
+        """
+        Run ChromeDriverManager once per pool instead of once per page
+        """
+        with self._lock:
+            if not self._service_resolved:
+                try:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    self._service_path = ChromeDriverManager().install()
+                except Exception as e:
+                    print(f"webdriver_manager unavailable ({e}), using Chrome from PATH")
+                    self._service_path = None
+                self._service_resolved = True
+            return self._service_path
+
+    def _create_driver(self):
+        """
+        Start a new Chrome instance with the pool's options
+        """
+        print("Starting a new pooled Chrome WebDriver...")
+        run_metrics.count("drivers_started")
+        with run_metrics.stage("driver_start"):
+            options = self.options_factory()
+            service_path = self._resolve_service_path()
+            if service_path:
+                try:
+                    driver = webdriver.Chrome(service=Service(service_path), options=options)
+                except WebDriverException:
+                    # Fall back to direct Chrome WebDriver
+                    driver = webdriver.Chrome(options=options)
+            else:
+                driver = webdriver.Chrome(options=options)
+        self._pages[id(driver)] = 0
+
+        # Count every page load towards the recycling budget
+        load_page = driver.get
+
+        def get(url):
+            self.count_page(driver)
+            return load_page(url)
+
+        driver.get = get
+        return driver
+
+    def count_page(self, driver):
+        """
+        Record one page load by a pooled driver
+        """
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+
+    def _is_healthy(self, driver):
+        """
+        Check that the browser process is still alive and responding
+        """
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        """
+        Quit a driver and forget about it
+        """
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """
+        Take a healthy driver from the pool, starting one if needed.
+        Blocks while all `size` drivers are in use.
+        """
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("Timed out waiting for a free WebDriver")
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create_driver()
+                if self._is_healthy(driver):
+                    return driver
+                print("Pooled WebDriver failed health check, replacing it...")
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        """
+        Return a driver to the pool. Broken drivers, and drivers that have
+        served `max_pages` pages, are quit and replaced on next acquire.
+        """
+        try:
+            if broken or self._closed:
+                self._discard(driver)
+                return
+
+            if self.max_pages and self._pages.get(id(driver), 0) >= self.max_pages:
+                print(f"Recycling WebDriver after {self._pages[id(driver)]} pages")
+                self._discard(driver)
+                return
+
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def borrow(self):
+        """
+        Context manager that lends out a driver and always returns it
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, broken=True)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self):
+        """
+        Quit all idle drivers. Drivers still on loan are quit when released.
+        """
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,41 @@
+import os
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup
+
+# BeautifulSoup tree builders we can switch between, fastest first.
+# All of them produce the same BeautifulSoup API, so the extraction code
+# (find_products, extract_product_data, the Property24 tile parser) runs unchanged.
+BACKENDS = {
+    "lxml": "lxml",
+    "html.parser": "html.parser",
+    "html5lib": "html5lib",
+}
+
+
+def available_backends():
+    """
+    Return the parser backends that are installed, fastest first
+    """
+    return [name for name in BACKENDS if name == "html.parser" or find_spec(name) is not None]
+
+
+def default_backend():
+    """
+    Pick the parser backend: the SCRAPER_HTML_PARSER environment variable if set,
+    otherwise the fastest one installed
+    """
+    backend = os.environ.get("SCRAPER_HTML_PARSER")
+    if backend:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {backend}. Choose from {list(BACKENDS)}")
+        return backend
+    return available_backends()[0]
+
+
+def make_soup(html_content, backend=None):
+    """
+    Parse HTML into a BeautifulSoup tree with the chosen (or default) backend
+    """
+    backend = backend or default_backend()
+    return BeautifulSoup(html_content, BACKENDS[backend])
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class HttpCache:
+    """
+    On-disk HTTP response cache for GET requests.
+
+    Bodies are stored as files under `directory` and their metadata in a small
+    SQLite table. Responses younger than `ttl` seconds are served straight from
+    disk. Older ones are revalidated with a conditional request (If-None-Match /
+    If-Modified-Since) so an unchanged page costs a 304 instead of a full
+    download. When the cache grows beyond `max_bytes`, the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, directory=".http_cache", ttl=6 * 3600, max_bytes=500 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                file TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _body_path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def _lookup(self, url):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT file, headers, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _touch(self, url, fetched_at=None):
+        now = time.time()
+        with self._lock:
+            if fetched_at is None:
+                self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            else:
+                self.conn.execute(
+                    "UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?", (fetched_at, now, url)
+                )
+            self.conn.commit()
+
+    def _store(self, url, response):
+        path = self._body_path(url)
+        with open(path, "wb") as f:
+            f.write(response.content)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, file, size, headers, etag, last_modified, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    path,
+                    len(response.content),
+                    json.dumps(dict(response.headers)),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    now,
+                    now,
+                ),
+            )
+            self.conn.commit()
+        self._evict()
+
+    def _evict(self):
+        """
+        Drop least recently used entries until the cache fits in max_bytes
+        """
+        with self._lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for url, path, size in self.conn.execute(
+                "SELECT url, file, size FROM responses ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+                self.evictions += 1  # Already holding the lock
+            self.conn.commit()
+
+    def _cached_response(self, url, path, headers):
+        """
+        Rebuild a requests.Response from a cached body
+        """
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        with open(path, "rb") as f:
+            response._content = f.read()
+        response.from_cache = True
+        return response
+
+    def is_fresh(self, url):
+        """
+        True if a GET for this URL would be served from disk without a request
+        """
+        entry = self._lookup(url)
+        return entry is not None and time.time() - entry[4] < self.ttl and os.path.exists(entry[0])
+
+    def get(self, url, session=None, headers=None, timeout=20):
+        """
+        GET a URL through the cache. Returns a requests.Response; only 200
+        responses are cached.
+        """
+        getter = session or requests
+        entry = self._lookup(url)
+
+        if entry is not None and not os.path.exists(entry[0]):
+            entry = None  # Body was removed from disk
+
+        if entry is not None:
+            path, cached_headers, etag, last_modified, fetched_at = entry
+            if time.time() - fetched_at < self.ttl:
+                self._count("hits")
+                self._touch(url)
+                return self._cached_response(url, path, cached_headers)
+
+            # Stale: ask the server whether it changed
+            conditional = dict(headers or {})
+            if etag:
+                conditional["If-None-Match"] = etag
+            if last_modified:
+                conditional["If-Modified-Since"] = last_modified
+            if etag or last_modified:
+                response = getter.get(url, headers=conditional, timeout=timeout)
+                if response.status_code == 304:
+                    self._count("revalidated")
+                    self._touch(url, fetched_at=time.time())
+                    return self._cached_response(url, path, cached_headers)
+                self._count("misses")
+                if response.status_code == 200:
+                    self._store(url, response)
+                response.from_cache = False
+                return response
+
+        self._count("misses")
+        response = getter.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            self._store(url, response)
+        response.from_cache = False
+        return response
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            for (path,) in self.conn.execute("SELECT file FROM responses").fetchall():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+_default_cache = None
+
+
+def default_cache():
+    """
+    The shared cache used by the scrapers, created on first use
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache(os.environ.get("SCRAPER_HTTP_CACHE", ".http_cache"))
+    return _default_cache
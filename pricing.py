@@ -0,0 +1,83 @@
+import re
+
+import pandas as pd
+
+# Patterns are compiled once at import time and shared by the scalar and vectorised paths
+NON_PRICE_CHARS = re.compile(r'[^\d.,]')
+# Any separator that is followed by another separator is a thousands separator
+INNER_SEPARATORS = re.compile(r'[.,](?=\d*[.,])')
+# A final separator followed by exactly three digits is also a thousands separator ("1,299")
+THOUSANDS_TAIL = re.compile(r'[.,](?=\d{3}$)')
+DECIMAL_COMMA = re.compile(r',')
+# Price inside free text, e.g. "R 123.45", "R123,45" or "R 1 299.00" (thousands
+# grouped by space, non-breaking space or comma)
+RAND_PRICE = re.compile(
+    r'R\s*(\d{1,3}(?:[ \xa0\u202f,]\d{3})+(?!\d)(?:[.,]\d+)?|\d+(?:[.,]\d+)?)'
+)
+# Any decimal number that might be a price
+DECIMAL_NUMBER = re.compile(r'\d+[.,]\d+')
+
+MIN_PRICE = 0
+MAX_PRICE = 100000
+
+
+def _clean(text):
+    text = NON_PRICE_CHARS.sub('', text)
+    text = INNER_SEPARATORS.sub('', text)
+    text = THOUSANDS_TAIL.sub('', text)
+    return DECIMAL_COMMA.sub('.', text)
+
+
+def parse_price(text):
+    """
+    Turn a price string like "R 1 299,00" or "R1,299.00" into a float.
+    Returns None if it is not a valid price.
+    """
+    if text is None:
+        return None
+    try:
+        price = float(_clean(str(text)))
+    except ValueError:
+        return None
+    if price <= MIN_PRICE or price > MAX_PRICE:
+        return None
+    return price
+
+
+def find_price_in_text(text):
+    """
+    Look for a price in free text when there is no dedicated price element
+    """
+    match = RAND_PRICE.search(text)
+    if match:
+        return match.group(0)
+    match = DECIMAL_NUMBER.search(text)
+    if match:
+        return match.group(0)
+    return None
+
+
+def normalise_prices(prices):
+    """
+    Vectorised version of parse_price for a whole pandas Series.
+    Numeric series are only range-checked; invalid prices become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(prices):
+        numeric = prices.astype(float)
+    else:
+        cleaned = (
+            prices.astype('string')
+            .str.replace(NON_PRICE_CHARS, '', regex=True)
+            .str.replace(INNER_SEPARATORS, '', regex=True)
+            .str.replace(THOUSANDS_TAIL, '', regex=True)
+            .str.replace(DECIMAL_COMMA, '.', regex=True)
+        )
+        numeric = pd.to_numeric(cleaned, errors='coerce').astype(float)
+    return numeric.where((numeric > MIN_PRICE) & (numeric <= MAX_PRICE))
+
+
+def format_price(price):
+    """
+    Display a numeric price in Rand
+    """
+    return f"R {price:.2f}"
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+# Fields that identify the same product/listing across runs, per site
+KEY_FIELDS = {
+    "makro": ["Name"],
+    "amazon": ["Title"],
+    "property24": ["Title", "Location"],
+    "amazon_products": ["asin"],
+    "property24_listings": ["listing_id"],
+}
+
+
+def content_hash(data):
+    """
+    Stable hash of a record or of raw page content
+    """
+    if isinstance(data, dict):
+        data = json.dumps(data, sort_keys=True, default=str)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+@dataclass
+class Delta:
+    """
+    What changed since the previous run
+    """
+    new: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    unchanged: int = 0
+    duplicates: int = 0
+
+    def extend(self, other):
+        self.new.extend(other.new)
+        self.changed.extend(other.changed)
+        self.removed.extend(other.removed)
+        self.unchanged += other.unchanged
+        self.duplicates += other.duplicates
+
+    def summary(self):
+        return (f"{len(self.new)} new, {len(self.changed)} changed, "
+                f"{len(self.removed)} removed, {self.unchanged} unchanged"
+                + (f" ({self.duplicates} duplicates skipped)" if self.duplicates else ""))
+
+
+class ProductIndex:
+    """
+    Persistent SQLite index of everything scraped so far.
+
+    Items are keyed on (site, identity) and store a content hash and
+    first/last-seen timestamps, so a run only has to emit new, changed and
+    removed items. Pages are stored with a hash of their HTML so unchanged
+    pages don't need to be parsed again.
+
+    Only items from sources (pages, queries) seen during a run can be
+    reported as removed, so runs over different URL lists or queries can
+    share one index. Within a run, a second record with the same identity
+    is skipped.
+
+    Typical run:
+
+        index = ProductIndex()
+        run = index.start_run()
+        for url, html in pages:
+            if not index.page_changed(url, html):
+                index.touch_source("makro", url)
+                continue
+            delta.extend(index.update("makro", parse(html), source=url))
+            index.record_page(url)
+        delta.removed = index.finish_run("makro", run)
+    """
+
+    def __init__(self, path="scrape_index.sqlite", key_fields=None):
+        self.path = path
+        self.key_fields = key_fields or KEY_FIELDS
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                site TEXT NOT NULL,
+                key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                data TEXT NOT NULL,
+                source TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (site, key)
+            );
+            CREATE INDEX IF NOT EXISTS items_source ON items (site, source);
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                html_hash TEXT NOT NULL,
+                last_seen REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+        # Per run: sources seen and item keys seen, per site
+        self._run_sources = {}
+        self._run_keys = {}
+        # HTML hashes of pages checked but not yet indexed
+        self._pending_pages = {}
+
+    def item_key(self, site, record):
+        return "|".join(str(record.get(name, "")) for name in self.key_fields[site])
+
+    def start_run(self):
+        """
+        Mark the start of a run; items of this run's sources not seen after this are reported as removed
+        """
+        self._run_sources = {}
+        self._run_keys = {}
+        return time.time()
+
+    def page_changed(self, url, html_content):
+        """
+        Return False if the page's HTML is the same as when it was last indexed.
+        The new hash is only stored by record_page(), once the page's items are indexed.
+        """
+        html_hash = content_hash(html_content)
+        row = self.conn.execute("SELECT html_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is not None and row[0] == html_hash:
+            return False
+        self._pending_pages[url] = html_hash
+        return True
+
+    def record_page(self, url):
+        """
+        Store the HTML hash checked by page_changed() after the page's items were indexed
+        """
+        html_hash = self._pending_pages.pop(url, None)
+        if html_hash is None:
+            return
+        self.conn.execute(
+            "INSERT INTO pages (url, html_hash, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET html_hash = excluded.html_hash, last_seen = excluded.last_seen",
+            (url, html_hash, time.time()),
+        )
+        self.conn.commit()
+
+    def touch_source(self, site, source):
+        """
+        Mark every item from an unchanged page as still present
+        """
+        self._run_sources.setdefault(site, set()).add(source)
+        self.conn.execute(
+            "UPDATE items SET last_seen = ? WHERE site = ? AND source = ?",
+            (time.time(), site, source),
+        )
+        self.conn.commit()
+
+    def update(self, site, records, source=None):
+        """
+        Compare records with the index, store them, and return the Delta
+        """
+        delta = Delta()
+        now = time.time()
+        self._run_sources.setdefault(site, set()).add(source)
+        seen = self._run_keys.setdefault(site, set())
+        for record in records:
+            key = self.item_key(site, record)
+            if key in seen:
+                # Same identity twice in one run (e.g. two tiles with the same name): keep the first
+                delta.duplicates += 1
+                continue
+            seen.add(key)
+            record_hash = content_hash(record)
+            row = self.conn.execute(
+                "SELECT content_hash FROM items WHERE site = ? AND key = ?", (site, key)
+            ).fetchone()
+
+            if row is None:
+                delta.new.append(record)
+                self.conn.execute(
+                    "INSERT INTO items (site, key, content_hash, data, source, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (site, key, record_hash, json.dumps(record, default=str), source, now, now),
+                )
+            elif row[0] != record_hash:
+                delta.changed.append(record)
+                self.conn.execute(
+                    "UPDATE items SET content_hash = ?, data = ?, source = ?, last_seen = ? "
+                    "WHERE site = ? AND key = ?",
+                    (record_hash, json.dumps(record, default=str), source, now, site, key),
+                )
+            else:
+                delta.unchanged += 1
+                self.conn.execute(
+                    "UPDATE items SET source = ?, last_seen = ? WHERE site = ? AND key = ?",
+                    (source, now, site, key),
+                )
+        self.conn.commit()
+        return delta
+
+    def finish_run(self, site, run_started):
+        """
+        Remove and return the items from this run's sources that were not seen
+        during the run. Items from sources the run didn't visit are left alone.
+        """
+        sources = self._run_sources.get(site, set())
+        named = [source for source in sources if source is not None]
+        conditions = []
+        if named:
+            conditions.append(f"source IN ({','.join('?' * len(named))})")
+        if None in sources:
+            conditions.append("source IS NULL")
+        if not conditions:
+            return []
+
+        where = f"site = ? AND last_seen < ? AND ({' OR '.join(conditions)})"
+        params = (site, run_started, *named)
+        rows = self.conn.execute(f"SELECT data FROM items WHERE {where}", params).fetchall()
+        self.conn.execute(f"DELETE FROM items WHERE {where}", params)
+        self.conn.commit()
+        return [json.loads(data) for (data,) in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def save_changes(delta, path):
+    """
+    Write new, changed and removed items to one CSV with a Change column
+    """
+    frames = []
+    for change, records in (("new", delta.new), ("changed", delta.changed), ("removed", delta.removed)):
+        if records:
+            frames.append(pd.DataFrame(records).assign(Change=change))
+    if not frames:
+        print("No changes since the last run.")
+        return None
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+    print(f"Saved changes ({delta.summary()}) to {path}")
+    return path
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from llama_index.core.async_utils import asyncio_run
+
+
+class RateLimiter:
+    """
+    Async token bucket: allows `rate` acquisitions per `per` seconds, with
+    bursts of up to `rate`. Used to stay under the Groq requests-per-minute limit.
+    """
+
+    def __init__(self, rate, per=60.0):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        if tokens > self.rate:
+            # The bucket never holds more than `rate` tokens, so this could never be granted
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.rate}")
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) * self.per / self.rate)
+
+
+def _is_rate_limit_error(error):
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text or "rate_limit" in text
+
+
+async def _run_one(engine, index, question, semaphore, limiter, llm_calls_per_question, retries, backoff):
+    async with semaphore:
+        for attempt in range(retries + 1):
+            if limiter is not None:
+                await limiter.acquire(llm_calls_per_question)
+            try:
+                return index, question, await engine.aquery(question)
+            except Exception as e:
+                if attempt < retries and _is_rate_limit_error(e):
+                    await asyncio.sleep(backoff * 2 ** attempt)
+                    continue
+                return index, question, e
+
+
+async def aquery_stream(engine, questions, concurrency=8, requests_per_minute=None,
+                        llm_calls_per_question=2, retries=3, backoff=5.0):
+    """
+    Run many questions through an engine's aquery concurrently and yield
+    (index, question, response) as each one completes. At most `concurrency`
+    questions are in flight. With `requests_per_minute`, question starts are
+    rate limited assuming each one makes `llm_calls_per_question` LLM calls
+    (router selection + synthesis). Rate-limit errors are retried with
+    backoff; other errors are yielded in place of the response.
+    """
+    if requests_per_minute and llm_calls_per_question > requests_per_minute:
+        raise ValueError(
+            f"llm_calls_per_question ({llm_calls_per_question}) exceeds "
+            f"requests_per_minute ({requests_per_minute}); no question could ever start"
+        )
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+    tasks = [
+        asyncio.ensure_future(_run_one(
+            engine, index, question, semaphore, limiter, llm_calls_per_question, retries, backoff
+        ))
+        for index, question in enumerate(questions)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def abatch_query(engine, questions, **options):
+    """
+    Run all questions concurrently and return the responses in question order
+    """
+    responses = [None] * len(questions)
+    async for index, _, response in aquery_stream(engine, questions, **options):
+        responses[index] = response
+    return responses
+
+
+def batch_query(engine, questions, **options):
+    """
+    Synchronous wrapper around abatch_query
+    """
+    return asyncio_run(abatch_query(engine, questions, **options))
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+
+def text_key(model_name, kind, text):
+    """
+    Cache key for one embedding: the model, whether it is a query or a text,
+    and a hash of the content
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model_name}:{kind}:{digest}"
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Wrap an embedding model (e.g. HuggingFaceEmbedding) with a persistent,
+    content-hash-keyed SQLite cache.
+
+    Only texts that have never been embedded by this model reach the wrapped
+    model, so rebuilding an index after a kernel restart costs nothing for
+    chunks that were already embedded.
+    """
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _conn: sqlite3.Connection = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    def __init__(self, inner, cache_path="storage/embeddings.sqlite", **kwargs):
+        super().__init__(
+            model_name=inner.model_name,
+            embed_batch_size=inner.embed_batch_size,
+            **kwargs,
+        )
+        self._inner = inner
+        self._lock = threading.Lock()
+        if os.path.dirname(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def class_name(cls):
+        return "CachedEmbedding"
+
+    @property
+    def inner(self):
+        return self._inner
+
+    def _load(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _save(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+            )
+            self._conn.commit()
+
+    def _cached(self, kind, texts, compute):
+        keys = [text_key(self.model_name, kind, text) for text in texts]
+        found = self._load(keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        self._hits += len(texts) - len(missing)
+        self._misses += len(missing)
+
+        if missing:
+            vectors = compute([texts[i] for i in missing])
+            self._save([(keys[i], vector) for i, vector in zip(missing, vectors)])
+            for i, vector in zip(missing, vectors):
+                found[keys[i]] = vector
+        return [found[key] for key in keys]
+
+    async def _acached(self, kind, texts, acompute):
+        keys = [text_key(self.model_name, kind, text) for text in texts]
+        found = self._load(keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        self._hits += len(texts) - len(missing)
+        self._misses += len(missing)
+
+        if missing:
+            vectors = await acompute([texts[i] for i in missing])
+            self._save([(keys[i], vector) for i, vector in zip(missing, vectors)])
+            for i, vector in zip(missing, vectors):
+                found[keys[i]] = vector
+        return [found[key] for key in keys]
+
+    def _get_query_embedding(self, query):
+        return self._cached("query", [query], lambda q: [self._inner.get_query_embedding(q[0])])[0]
+
+    async def _aget_query_embedding(self, query):
+        async def compute(q):
+            return [await self._inner.aget_query_embedding(q[0])]
+        return (await self._acached("query", [query], compute))[0]
+
+    def _get_text_embedding(self, text):
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text):
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts):
+        return self._cached(
+            "text", texts, lambda t: self._inner.get_text_embedding_batch(t, show_progress=False)
+        )
+
+    async def _aget_text_embeddings(self, texts):
+        return await self._acached("text", texts, self._inner.aget_text_embedding_batch)
+
+    def cached_text_embeddings(self, texts, compute):
+        """
+        Look texts up in the cache and call compute(missing_texts) -> vectors
+        for the rest, e.g. to embed them on a process pool
+        """
+        return self._cached("text", texts, compute)
+
+    def stats(self):
+        return {"hits": self._hits, "misses": self._misses}
+
+
+def nodes_fingerprint(nodes):
+    """
+    Hash of the chunk contents, independent of the random node ids the splitter assigns
+    """
+    digest = hashlib.sha256()
+    for node in nodes:
+        digest.update(node.get_content(metadata_mode="all").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,165 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from llama_index.core import SimpleDirectoryReader
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode
+
+
+@dataclass
+class IngestionStats:
+    documents: int = 0
+    nodes: int = 0
+    embedded: int = 0
+    load_seconds: float = 0.0
+    embed_seconds: float = 0.0
+
+    def report(self):
+        docs_per_s = self.documents / self.load_seconds if self.load_seconds else 0.0
+        nodes_per_s = self.nodes / self.load_seconds if self.load_seconds else 0.0
+        embed_per_s = self.embedded / self.embed_seconds if self.embed_seconds else 0.0
+        return (
+            f"Loaded {self.documents} docs into {self.nodes} nodes in {self.load_seconds:.1f}s "
+            f"({docs_per_s:.1f} docs/s, {nodes_per_s:.1f} nodes/s); "
+            f"embedded {self.embedded} nodes in {self.embed_seconds:.1f}s ({embed_per_s:.1f} nodes/s)"
+        )
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def load_and_split_file(path, chunk_size=1024, chunk_overlap=200):
+    """
+    Load one file and split it into nodes. Runs inside a worker process.
+    """
+    documents = SimpleDirectoryReader(input_files=[path]).load_data()
+    splitter = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return len(documents), splitter.get_nodes_from_documents(documents)
+
+
+def load_and_split(paths, chunk_size=1024, chunk_overlap=200, workers=None, stats=None):
+    """
+    Load and split many files in parallel, one file per task
+    """
+    stats = stats or IngestionStats()
+    workers = workers or default_workers()
+    start = time.perf_counter()
+
+    nodes = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(load_and_split_file, path, chunk_size, chunk_overlap) for path in paths]
+        for future in futures:
+            n_documents, file_nodes = future.result()
+            stats.documents += n_documents
+            nodes.extend(file_nodes)
+
+    stats.nodes += len(nodes)
+    stats.load_seconds += time.perf_counter() - start
+    return nodes
+
+
+# Each worker process loads its own copy of the embedding model once
+_worker_model = None
+
+
+def huggingface_embedding(model_name, batch_size):
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    return HuggingFaceEmbedding(model_name=model_name, embed_batch_size=batch_size)
+
+
+def _init_embed_worker(model_factory, model_name, batch_size, threads):
+    global _worker_model
+    try:
+        import torch
+        # Split the cores between processes instead of every process using all of them
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = model_factory(model_name, batch_size)
+
+
+def _embed_batch(texts):
+    return _worker_model.get_text_embedding_batch(texts, show_progress=False)
+
+
+def embed_texts(texts, model_name, batch_size=32, workers=None, model_factory=huggingface_embedding):
+    """
+    Embed texts in batches of `batch_size` across a pool of CPU processes
+    """
+    if not texts:
+        return []
+    workers = min(workers or default_workers(), max(1, len(texts) // batch_size))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_embed_worker,
+        initargs=(model_factory, model_name, batch_size, threads),
+    ) as executor:
+        vectors = []
+        for batch_vectors in executor.map(_embed_batch, batches):
+            vectors.extend(batch_vectors)
+    return vectors
+
+
+def embed_nodes(nodes, model_name, batch_size=32, workers=None, cache=None,
+                model_factory=huggingface_embedding, stats=None):
+    """
+    Attach embeddings to nodes using the process pool. With a CachedEmbedding
+    as `cache`, only nodes whose text isn't cached yet are sent to the pool,
+    and new vectors are written back to the cache.
+    """
+    stats = stats or IngestionStats()
+    start = time.perf_counter()
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+
+    def compute(missing):
+        stats.embedded += len(missing)
+        return embed_texts(missing, model_name, batch_size, workers, model_factory)
+
+    if cache is not None:
+        vectors = cache.cached_text_embeddings(texts, compute)
+    else:
+        vectors = compute(texts)
+
+    for node, vector in zip(nodes, vectors):
+        node.embedding = vector
+    stats.embed_seconds += time.perf_counter() - start
+    return nodes
+
+
+def tune_batch_size(texts, model_name, candidates=(8, 16, 32, 64, 128), model_factory=huggingface_embedding):
+    """
+    Time embedding a sample of texts with each batch size in this process and
+    return the fastest one
+    """
+    best, best_rate = candidates[0], 0.0
+    for batch_size in candidates:
+        model = model_factory(model_name, batch_size)
+        model.get_text_embedding_batch(texts[:batch_size])  # Warm up
+        start = time.perf_counter()
+        model.get_text_embedding_batch(texts, show_progress=False)
+        rate = len(texts) / (time.perf_counter() - start)
+        print(f"batch_size={batch_size}: {rate:.1f} texts/s")
+        if rate > best_rate:
+            best, best_rate = batch_size, rate
+    return best
+
+
+def ingest(paths, model_name, chunk_size=1024, batch_size=32, workers=None, cache=None,
+           model_factory=huggingface_embedding):
+    """
+    Load, split and embed a corpus of files in parallel. Returns nodes with
+    embeddings attached, ready for HybridRetriever.from_nodes(nodes, ...), which
+    skips nodes that already have an embedding.
+    """
+    stats = IngestionStats()
+    nodes = load_and_split(paths, chunk_size=chunk_size, workers=workers, stats=stats)
+    embed_nodes(nodes, model_name, batch_size=batch_size, workers=workers, cache=cache,
+                model_factory=model_factory, stats=stats)
+    print(stats.report())
+    return nodes
@@ -0,0 +1,316 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import MetadataMode, NodeWithScore
+
+from router_embeddings import CachedEmbedding, nodes_fingerprint
+
+# Try importing hnswlib - without it the dense side falls back to an exact numpy scan
+hnswlib_available = True
+try:
+    import hnswlib
+except ImportError:
+    hnswlib_available = False
+
+TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by do does for from how in is it of on or that the this to was what "
+    "when where which who why with about into their there these they tell me".split()
+)
+
+
+def tokenize(text):
+    """
+    Lowercase word tokens without stopwords, shared by indexing and querying
+    """
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def node_text(node):
+    return node.get_content(metadata_mode=MetadataMode.EMBED)
+
+
+class BM25Index:
+    """
+    Okapi BM25 keyword index over a list of nodes.
+
+    Stored as an inverted index (term -> postings of node position and term
+    frequency), so scoring a query only touches the postings of its terms.
+    Persisted as JSON next to the dense index.
+    """
+
+    def __init__(self, node_ids, doc_lengths, postings, k1=1.5, b=0.75):
+        self.node_ids = node_ids
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.avg_length = float(self.doc_lengths.mean()) if len(node_ids) else 0.0
+        self._arrays = {}
+
+    @classmethod
+    def build(cls, nodes, **params):
+        postings = {}
+        doc_lengths = []
+        for position, node in enumerate(nodes):
+            tokens = tokenize(node_text(node))
+            doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append((position, frequency))
+        return cls([node.node_id for node in nodes], doc_lengths, postings, **params)
+
+    def _postings(self, term):
+        # Postings as numpy arrays, converted lazily the first time a term is queried
+        if term not in self._arrays:
+            entries = self.postings.get(term)
+            if not entries:
+                self._arrays[term] = None
+            else:
+                positions, frequencies = zip(*entries)
+                self._arrays[term] = (np.array(positions), np.array(frequencies, dtype=np.float32))
+        return self._arrays[term]
+
+    def scores(self, query):
+        """
+        BM25 score of every node for the query (0 for nodes without any query term)
+        """
+        scores = np.zeros(len(self.node_ids), dtype=np.float32)
+        n = len(self.node_ids)
+        for term in set(tokenize(query)):
+            postings = self._postings(term)
+            if postings is None:
+                continue
+            positions, frequencies = postings
+            idf = math.log(1 + (n - len(positions) + 0.5) / (len(positions) + 0.5))
+            lengths = self.doc_lengths[positions] / (self.avg_length or 1.0)
+            scores[positions] += idf * frequencies * (self.k1 + 1) / (
+                frequencies + self.k1 * (1 - self.b + self.b * lengths)
+            )
+        return scores
+
+    def top_k(self, query, k):
+        """
+        (positions, scores) of the k best-scoring nodes, best first, skipping zero scores
+        """
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return np.array([], dtype=int), np.array([], dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] > 0]
+        return top, scores[top]
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "node_ids": self.node_ids,
+                "doc_lengths": self.doc_lengths.tolist(),
+                "postings": self.postings,
+                "k1": self.k1,
+                "b": self.b,
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["node_ids"], data["doc_lengths"], data["postings"], k1=data["k1"], b=data["b"])
+
+
+class DenseIndex:
+    """
+    Approximate nearest-neighbour search over node embeddings (cosine).
+
+    Uses an HNSW graph (hnswlib) when installed, so a query visits a small
+    part of the corpus instead of scanning every vector; otherwise an exact
+    numpy matrix scan. Both return (positions, cosine similarities).
+    """
+
+    def __init__(self, vectors, M=16, ef_construction=200, ef=64, use_hnsw=None):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+        self.ef = ef
+        self.hnsw = None
+        if hnswlib_available if use_hnsw is None else use_hnsw:
+            self.hnsw = hnswlib.Index(space="cosine", dim=self.vectors.shape[1])
+            self.hnsw.init_index(max_elements=max(len(self.vectors), 1), M=M, ef_construction=ef_construction)
+            if len(self.vectors):
+                self.hnsw.add_items(self.vectors, np.arange(len(self.vectors)))
+
+    @classmethod
+    def load(cls, directory, ef=64, use_hnsw=None):
+        index = cls.__new__(cls)
+        index.vectors = np.load(os.path.join(directory, "vectors.npy"))
+        index.ef = ef
+        index.hnsw = None
+        hnsw_path = os.path.join(directory, "hnsw.bin")
+        if (hnswlib_available if use_hnsw is None else use_hnsw) and os.path.exists(hnsw_path):
+            index.hnsw = hnswlib.Index(space="cosine", dim=index.vectors.shape[1])
+            index.hnsw.load_index(hnsw_path, max_elements=len(index.vectors))
+        return index
+
+    def save(self, directory):
+        np.save(os.path.join(directory, "vectors.npy"), self.vectors)
+        if self.hnsw is not None:
+            self.hnsw.save_index(os.path.join(directory, "hnsw.bin"))
+
+    def top_k(self, query_vector, k):
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        k = min(k, len(self.vectors))
+        if k == 0:
+            return np.array([], dtype=int), np.array([], dtype=np.float32)
+
+        if self.hnsw is not None:
+            self.hnsw.set_ef(max(self.ef, k))
+            labels, distances = self.hnsw.knn_query(query, k=k)
+            return labels[0].astype(int), 1 - distances[0]
+
+        similarities = self.vectors @ query
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return top, similarities[top]
+
+
+def node_embeddings(nodes, embed_model):
+    """
+    Embeddings for the nodes: reuse any already attached (e.g. by router_ingestion),
+    embed the rest. With a CachedEmbedding only chunks never embedded before reach the model.
+    """
+    missing = [i for i, node in enumerate(nodes) if node.embedding is None]
+    computed = embed_model.get_text_embedding_batch([node_text(nodes[i]) for i in missing]) if missing else []
+    vectors = [node.embedding for node in nodes]
+    for i, vector in zip(missing, computed):
+        vectors[i] = vector
+    return vectors
+
+
+def _min_max(scores):
+    if len(scores) == 0:
+        return scores
+    low, high = float(np.min(scores)), float(np.max(scores))
+    if high - low < 1e-9:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def fuse(dense, keyword, alpha=0.5, mode="relative", rrf_k=60):
+    """
+    Combine dense and BM25 candidate lists, each (positions, scores) best first,
+    into {position: fused score}.
+
+    "relative": min-max normalise each list and take alpha * dense + (1 - alpha) * bm25.
+    "rrf": reciprocal rank fusion, weighted the same way; ignores score scales entirely.
+    """
+    fused = Counter()
+    for (positions, scores), weight in ((dense, alpha), (keyword, 1 - alpha)):
+        if mode == "rrf":
+            for rank, position in enumerate(positions):
+                fused[int(position)] += weight / (rrf_k + rank + 1)
+        else:
+            for position, score in zip(positions, _min_max(np.asarray(scores, dtype=np.float32))):
+                fused[int(position)] += weight * float(score)
+    return fused
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense (HNSW) + BM25 keyword retrieval over the same nodes, fused and
+    reranked into the final top-k.
+
+    Each side proposes `candidates` nodes; the union is rescored with
+    fuse() and the best `similarity_top_k` are returned. Use from_nodes()
+    to load both indexes from persist_dir, rebuilding them only when the
+    chunks or the embedding model change.
+
+        retriever = HybridRetriever.from_nodes(nodes, embed_model)
+        query_engine = RetrieverQueryEngine.from_args(retriever, llm=llm)
+    """
+
+    def __init__(self, nodes, embed_model, bm25, dense, similarity_top_k=2, candidates=20,
+                 alpha=0.5, fusion="relative"):
+        super().__init__()
+        self.nodes = list(nodes)
+        self.embed_model = embed_model
+        self.bm25 = bm25
+        self.dense = dense
+        self.similarity_top_k = similarity_top_k
+        self.candidates = candidates
+        self.alpha = alpha
+        self.fusion = fusion
+
+    @classmethod
+    def from_nodes(cls, nodes, embed_model, persist_dir="storage/hybrid_index", **options):
+        bm25, dense = load_or_build_hybrid_index(nodes, embed_model, persist_dir)
+        return cls(nodes, embed_model, bm25, dense, **options)
+
+    def _query_vector(self, query_bundle):
+        if query_bundle.embedding is not None:
+            return query_bundle.embedding
+        return self.embed_model.get_query_embedding(query_bundle.query_str)
+
+    async def _aquery_vector(self, query_bundle):
+        if query_bundle.embedding is not None:
+            return query_bundle.embedding
+        return await self.embed_model.aget_query_embedding(query_bundle.query_str)
+
+    def _rank(self, query_str, query_vector):
+        k = max(self.candidates, self.similarity_top_k)
+        fused = fuse(
+            self.dense.top_k(query_vector, k),
+            self.bm25.top_k(query_str, k),
+            alpha=self.alpha,
+            mode=self.fusion,
+        )
+        return [
+            NodeWithScore(node=self.nodes[position], score=score)
+            for position, score in fused.most_common(self.similarity_top_k)
+        ]
+
+    def _retrieve(self, query_bundle):
+        return self._rank(query_bundle.query_str, self._query_vector(query_bundle))
+
+    async def _aretrieve(self, query_bundle):
+        return self._rank(query_bundle.query_str, await self._aquery_vector(query_bundle))
+
+
+def load_or_build_hybrid_index(nodes, embed_model, persist_dir="storage/hybrid_index"):
+    """
+    Load the persisted BM25 and dense indexes if they were built from the same
+    chunks and embedding model, otherwise build and persist them.
+    Returns (BM25Index, DenseIndex).
+    """
+    manifest_path = os.path.join(persist_dir, "manifest.json")
+    fingerprint = nodes_fingerprint(nodes)
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("fingerprint") == fingerprint and manifest.get("model_name") == embed_model.model_name:
+            print(f"Loading hybrid index from {persist_dir}")
+            return BM25Index.load(os.path.join(persist_dir, "bm25.json")), DenseIndex.load(persist_dir)
+        print("Document chunks changed since the hybrid index was persisted, rebuilding...")
+
+    os.makedirs(persist_dir, exist_ok=True)
+    bm25 = BM25Index.build(nodes)
+    dense = DenseIndex(node_embeddings(nodes, embed_model))
+    bm25.save(os.path.join(persist_dir, "bm25.json"))
+    dense.save(persist_dir)
+    with open(manifest_path, "w") as f:
+        json.dump({
+            "fingerprint": fingerprint,
+            "model_name": embed_model.model_name,
+            "nodes": len(nodes),
+            "hnsw": dense.hnsw is not None,
+        }, f)
+    print(f"Built hybrid index over {len(nodes)} nodes ({'HNSW' if dense.hnsw is not None else 'exact'} dense search)")
+    if isinstance(embed_model, CachedEmbedding):
+        print(f"Embedding cache: {embed_model.stats()}")
+    return bm25, dense
@@ -0,0 +1,181 @@
+import re
+from collections import Counter, OrderedDict
+
+import numpy as np
+from llama_index.core.base.base_selector import BaseSelector, SelectorResult, SingleSelection
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_query(query_str):
+    """
+    Lowercase, drop punctuation and collapse whitespace, so trivially different
+    spellings of the same question share a cache entry
+    """
+    return WHITESPACE.sub(" ", PUNCTUATION.sub(" ", query_str.lower())).strip()
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class CachedSelector(BaseSelector):
+    """
+    Routing layer in front of an LLM selector (e.g. LLMSingleSelector).
+
+    A routing decision is looked up, in order, by:
+      1. the normalised query text (exact repeat)
+      2. embedding similarity to a previously routed query (>= similarity_threshold)
+      3. a nearest-centroid classifier over the embeddings of past decisions and
+         seed examples, if the top choice wins by at least centroid_margin
+    and only falls back to the LLM selector when none of these is confident.
+    At most max_entries past decisions are kept; the least recently used is
+    evicted first.
+    """
+
+    def __init__(self, selector, embed_model=None, max_entries=1000, similarity_threshold=0.92,
+                 centroid_margin=0.05, min_examples=3, examples=None):
+        self.selector = selector
+        self.embed_model = embed_model
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.centroid_margin = centroid_margin
+        self.min_examples = min_examples
+
+        # Per set of choices: OrderedDict of normalised query -> (unit vector or None, SelectorResult, from LLM)
+        self._entries = {}
+        # Per set of choices: {choice index: [vector sum, count]} from past decisions and seeds
+        self._centroids = {}
+        self._examples = examples or {}
+        self._seeded = set()
+        self.stats = Counter()
+
+    def _get_prompts(self):
+        return {}
+
+    def _update_prompts(self, prompts):
+        pass
+
+    def _get_prompt_modules(self):
+        return {"selector": self.selector}
+
+    @staticmethod
+    def _choices_key(choices):
+        return tuple(choice.description for choice in choices)
+
+    def _add_to_centroid(self, choices_key, index, vector, sign=1):
+        sums = self._centroids.setdefault(choices_key, {})
+        if index not in sums:
+            sums[index] = [np.zeros_like(vector), 0]
+        sums[index][0] = sums[index][0] + sign * vector
+        sums[index][1] += sign
+
+    def _seed(self, choices_key, embed):
+        """
+        Add the seed examples ({choice index: [queries]}) to the centroids once per set of choices
+        """
+        if choices_key in self._seeded or self.embed_model is None:
+            return
+        self._seeded.add(choices_key)
+        for index, queries in self._examples.items():
+            for query in queries:
+                self._add_to_centroid(choices_key, index, _unit(embed(query)))
+
+    def _lookup(self, choices_key, key, vector):
+        """
+        Return (cached decision or None, whether the decision should be cached under this query)
+        """
+        entries = self._entries.setdefault(choices_key, OrderedDict())
+
+        if key in entries:
+            entries.move_to_end(key)
+            self.stats["exact"] += 1
+            return entries[key][1], False
+
+        if vector is None:
+            return None, False
+
+        # Most similar previously routed query
+        stored = [(k, v) for k, (v, _, _) in entries.items() if v is not None]
+        if stored:
+            matrix = np.stack([v for _, v in stored])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                best_key = stored[best][0]
+                entries.move_to_end(best_key)
+                self.stats["similar"] += 1
+                return entries[best_key][1], False
+
+        # Nearest centroid, only if it is clearly ahead of the runner-up
+        centroids = [
+            (index, _unit(total))
+            for index, (total, count) in self._centroids.get(choices_key, {}).items()
+            if count >= self.min_examples
+        ]
+        if len(centroids) >= 2:
+            scores = sorted(((float(c @ vector), index) for index, c in centroids), reverse=True)
+            if scores[0][0] - scores[1][0] >= self.centroid_margin:
+                self.stats["centroid"] += 1
+                result = SelectorResult(selections=[
+                    SingleSelection(index=scores[0][1], reason="Nearest routing centroid")
+                ])
+                return result, True
+        return None, False
+
+    def _store(self, choices_key, key, vector, result, from_llm):
+        """
+        Cache a decision. Only LLM decisions feed the centroids, so the
+        classifier doesn't reinforce its own guesses.
+        """
+        entries = self._entries.setdefault(choices_key, OrderedDict())
+        entries[key] = (vector, result, from_llm)
+        if vector is not None and from_llm:
+            for selection in result.selections:
+                self._add_to_centroid(choices_key, selection.index, vector)
+
+        while len(entries) > self.max_entries:
+            _, (old_vector, old_result, old_from_llm) = entries.popitem(last=False)
+            self.stats["evicted"] += 1
+            if old_vector is not None and old_from_llm:
+                for selection in old_result.selections:
+                    self._add_to_centroid(choices_key, selection.index, old_vector, sign=-1)
+
+    def _select(self, choices, query):
+        choices_key = self._choices_key(choices)
+        key = normalise_query(query.query_str)
+        vector = None
+        if self.embed_model is not None:
+            self._seed(choices_key, self.embed_model.get_query_embedding)
+            if key not in self._entries.get(choices_key, {}):
+                vector = _unit(self.embed_model.get_query_embedding(query.query_str))
+
+        result, store = self._lookup(choices_key, key, vector)
+        if result is None:
+            self.stats["llm"] += 1
+            result = self.selector.select(choices, query)
+            self._store(choices_key, key, vector, result, from_llm=True)
+        elif store:
+            self._store(choices_key, key, vector, result, from_llm=False)
+        return result
+
+    async def _aselect(self, choices, query):
+        choices_key = self._choices_key(choices)
+        key = normalise_query(query.query_str)
+        vector = None
+        if self.embed_model is not None:
+            self._seed(choices_key, self.embed_model.get_query_embedding)
+            if key not in self._entries.get(choices_key, {}):
+                vector = _unit(await self.embed_model.aget_query_embedding(query.query_str))
+
+        result, store = self._lookup(choices_key, key, vector)
+        if result is None:
+            self.stats["llm"] += 1
+            result = await self.selector.aselect(choices, query)
+            self._store(choices_key, key, vector, result, from_llm=True)
+        elif store:
+            self._store(choices_key, key, vector, result, from_llm=False)
+        return result
@@ -0,0 +1,131 @@
+import json
+import os
+import re
+
+from llama_index.core import get_response_synthesizer
+from llama_index.core.async_utils import asyncio_run, run_jobs
+from llama_index.core.query_engine import CustomQueryEngine
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from router_embeddings import nodes_fingerprint
+
+SUMMARY_PROMPT = (
+    "Write a concise summary of the following text. Keep the key facts, names, "
+    "methods and numbers.\n\n{text}\n\nSummary:"
+)
+
+# Reasoning models (e.g. deepseek-r1) put their chain of thought in <think> tags
+THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+def _clean(text):
+    return THINK_BLOCK.sub("", text).strip()
+
+
+def group_texts(texts, fan_in=8, max_chars=8000):
+    """
+    Split texts into consecutive groups of at most fan_in texts and about max_chars characters
+    """
+    groups, current, size = [], [], 0
+    for text in texts:
+        if current and (len(current) >= fan_in or size + len(text) > max_chars):
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+class SummaryTree:
+    """
+    Hierarchical summary of a document, built once and persisted as JSON.
+
+    Level 0 is the chunk texts; each higher level summarises groups of the
+    level below until a single root summary is left. The tree is tied to a
+    fingerprint of the chunk contents and is only rebuilt when they change.
+    """
+
+    def __init__(self, fingerprint, levels):
+        self.fingerprint = fingerprint
+        self.levels = levels
+
+    @classmethod
+    def build(cls, nodes, llm, fan_in=8, max_chars=8000, workers=8):
+        texts = [node.get_content() for node in nodes]
+        levels = [texts]
+        while len(levels[-1]) > 1:
+            groups = group_texts(levels[-1], fan_in, max_chars)
+            if len(groups) == len(levels[-1]) and len(groups) > 1:
+                # Texts too long to group; fall back to pairs so the tree still shrinks
+                groups = group_texts(levels[-1], 2, float("inf"))
+            prompts = [SUMMARY_PROMPT.format(text="\n\n".join(group)) for group in groups]
+            print(f"Summarising level {len(levels)}: {len(prompts)} LLM calls")
+            responses = asyncio_run(run_jobs([llm.acomplete(p) for p in prompts], workers=workers))
+            levels.append([_clean(response.text) for response in responses])
+        return cls(nodes_fingerprint(nodes), levels)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["fingerprint"], data["levels"])
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "levels": self.levels}, f, ensure_ascii=False)
+
+    @classmethod
+    def load_or_build(cls, nodes, llm, path="storage/summary_tree.json", **build_options):
+        """
+        Reuse the persisted tree if the chunks are unchanged, otherwise rebuild and save it
+        """
+        if os.path.exists(path):
+            tree = cls.load(path)
+            if tree.fingerprint == nodes_fingerprint(nodes):
+                print(f"Loaded summary tree from {path} ({len(tree.levels) - 1} levels)")
+                return tree
+            print("Document chunks changed, rebuilding the summary tree...")
+        tree = cls.build(nodes, llm, **build_options)
+        tree.save(path)
+        return tree
+
+    def context_level(self, max_summaries=8):
+        """
+        The most detailed level above the raw chunks that has at most max_summaries summaries
+        """
+        for level in self.levels[1:]:
+            if len(level) <= max_summaries:
+                return level
+        return self.levels[-1]
+
+
+class CachedSummaryQueryEngine(CustomQueryEngine):
+    """
+    Answer summary questions from the cached upper levels of a SummaryTree,
+    instead of running tree_summarize over every chunk on each question.
+    A question usually costs a single LLM call.
+    """
+
+    tree: SummaryTree
+    synthesizer: object
+    max_summaries: int = 8
+
+    @classmethod
+    def from_nodes(cls, nodes, llm, persist_path="storage/summary_tree.json", max_summaries=8, **build_options):
+        tree = SummaryTree.load_or_build(nodes, llm, persist_path, **build_options)
+        synthesizer = get_response_synthesizer(llm=llm, response_mode="tree_summarize", use_async=True)
+        return cls(tree=tree, synthesizer=synthesizer, max_summaries=max_summaries)
+
+    def _summary_nodes(self):
+        return [NodeWithScore(node=TextNode(text=text), score=1.0)
+                for text in self.tree.context_level(self.max_summaries)]
+
+    def custom_query(self, query_str):
+        return self.synthesizer.synthesize(query_str, nodes=self._summary_nodes())
+
+    async def acustom_query(self, query_str):
+        return await self.synthesizer.asynthesize(query_str, nodes=self._summary_nodes())
@@ -0,0 +1,256 @@
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+import llama_index.core.instrumentation as instrument
+from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+from llama_index.core.instrumentation.events.embedding import EmbeddingEndEvent, EmbeddingStartEvent
+from llama_index.core.instrumentation.events.llm import (
+    LLMChatEndEvent,
+    LLMChatStartEvent,
+    LLMCompletionEndEvent,
+    LLMCompletionStartEvent,
+)
+from llama_index.core.instrumentation.events.retrieval import RetrievalEndEvent, RetrievalStartEvent
+from llama_index.core.instrumentation.events.synthesis import SynthesizeEndEvent, SynthesizeStartEvent
+
+# The trace of the query currently running in this context (propagates into asyncio tasks)
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+STAGES = ["select_llm", "embed", "retrieve", "synthesize", "synthesis_llm", "total"]
+COUNTS = ["llm_calls", "prompt_tokens", "completion_tokens", "retrieved_nodes", "source_nodes"]
+
+
+class Trace:
+    """
+    Per-stage wall times and counts for one query
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.started = time.time()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.counts = dict.fromkeys(COUNTS, 0)
+        self.selected = None
+        self._open = {}
+        self._synthesizing = 0
+
+    def start(self, stage, span_id):
+        self._open[(stage, span_id)] = time.perf_counter()
+
+    def end(self, stage, span_id):
+        started = self._open.pop((stage, span_id), None)
+        if started is not None:
+            self.stages[stage] += time.perf_counter() - started
+
+    def as_record(self):
+        return {
+            "query": self.query,
+            "started": self.started,
+            "selected": self.selected,
+            **{f"{stage}_s": round(seconds, 6) for stage, seconds in self.stages.items()},
+            **self.counts,
+        }
+
+
+def _token_usage(response):
+    """
+    Prompt/completion token counts from an LLM response, if the provider reports them
+    """
+    if response is None:
+        return 0, 0
+    usage = response.additional_kwargs or {}
+    if "prompt_tokens" not in usage:
+        raw = response.raw
+        usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+        if usage is not None and not isinstance(usage, dict):
+            usage = {
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+                "completion_tokens": getattr(usage, "completion_tokens", 0),
+            }
+    usage = usage or {}
+    return usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0
+
+
+class TracingEventHandler(BaseEventHandler):
+    """
+    Turns llama-index instrumentation events into stage timings on the current Trace
+    """
+
+    @classmethod
+    def class_name(cls):
+        return "TracingEventHandler"
+
+    def handle(self, event, **kwargs: Any):
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        span_id = event.span_id
+
+        if isinstance(event, EmbeddingStartEvent):
+            trace.start("embed", span_id)
+        elif isinstance(event, EmbeddingEndEvent):
+            trace.end("embed", span_id)
+        elif isinstance(event, RetrievalStartEvent):
+            trace.start("retrieve", span_id)
+        elif isinstance(event, RetrievalEndEvent):
+            trace.end("retrieve", span_id)
+            trace.counts["retrieved_nodes"] += len(event.nodes)
+        elif isinstance(event, SynthesizeStartEvent):
+            trace._synthesizing += 1
+            trace.start("synthesize", span_id)
+        elif isinstance(event, SynthesizeEndEvent):
+            trace._synthesizing -= 1
+            trace.end("synthesize", span_id)
+        elif isinstance(event, (LLMChatStartEvent, LLMCompletionStartEvent)):
+            # LLM calls outside synthesis are the router's selector decision
+            trace.start("synthesis_llm" if trace._synthesizing else "select_llm", span_id)
+            trace.counts["llm_calls"] += 1
+        elif isinstance(event, (LLMChatEndEvent, LLMCompletionEndEvent)):
+            trace.end("synthesis_llm" if ("synthesis_llm", span_id) in trace._open else "select_llm", span_id)
+            prompt_tokens, completion_tokens = _token_usage(event.response)
+            trace.counts["prompt_tokens"] += prompt_tokens
+            trace.counts["completion_tokens"] += completion_tokens
+
+
+def install_handler():
+    """
+    Register the tracing handler on the root dispatcher once per process.
+    The handler records into whichever trace is current, so every QueryTracer shares it.
+    """
+    dispatcher = instrument.get_dispatcher()
+    for handler in dispatcher.event_handlers:
+        # Compare by name so a reloaded module doesn't add a second handler
+        if handler.class_name() == TracingEventHandler.class_name():
+            return handler
+    handler = TracingEventHandler()
+    dispatcher.add_event_handler(handler)
+    return handler
+
+
+class QueryTracer:
+    """
+    Records per-stage latency, token and retrieval counts for every query run
+    through it, appends each trace to a JSONL file, and aggregates p50/p95.
+
+        tracer = QueryTracer("storage/traces.jsonl")
+        response = tracer.query(query_engine, "How do agents share information?")
+        tracer.report()
+        tracer.write_prometheus("storage/router_metrics.prom")
+    """
+
+    def __init__(self, path="storage/traces.jsonl"):
+        self.path = path
+        self.traces = []
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        install_handler()
+
+    @contextmanager
+    def trace(self, query):
+        trace = Trace(query)
+        token = _current_trace.set(trace)
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.stages["total"] = time.perf_counter() - started
+            _current_trace.reset(token)
+            self._record(trace)
+
+    def _finish(self, trace, response):
+        trace.counts["source_nodes"] = len(getattr(response, "source_nodes", None) or [])
+        selector_result = (getattr(response, "metadata", None) or {}).get("selector_result")
+        if selector_result is not None:
+            trace.selected = selector_result.inds
+
+    def query(self, engine, question):
+        with self.trace(question) as trace:
+            response = engine.query(question)
+            self._finish(trace, response)
+        return response
+
+    async def aquery(self, engine, question):
+        with self.trace(question) as trace:
+            response = await engine.aquery(question)
+            self._finish(trace, response)
+        return response
+
+    def wrap(self, engine):
+        """
+        Engine-like wrapper so traced queries can go through router_batch as well
+        """
+        return TracedEngine(engine, self)
+
+    def _record(self, trace):
+        self.traces.append(trace)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.as_record()) + "\n")
+
+    def summary(self):
+        """
+        p50/p95/mean per stage (seconds) and mean per count, over all traces so far
+        (all zeros before the first query)
+        """
+        result = {}
+        for stage in STAGES:
+            values = np.array([t.stages[stage] for t in self.traces] or [0.0])
+            result[stage] = {
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "mean": float(values.mean()),
+                "sum": float(values.sum()),
+            }
+        for count in COUNTS:
+            values = np.array([t.counts[count] for t in self.traces] or [0])
+            result[count] = {"mean": float(values.mean()), "sum": int(values.sum())}
+        return result
+
+    def report(self):
+        summary = self.summary()
+        print(f"{len(self.traces)} queries")
+        print(f"{'stage':<16}{'p50 s':>9}{'p95 s':>9}{'mean s':>9}")
+        for stage in STAGES:
+            s = summary[stage]
+            print(f"{stage:<16}{s['p50']:>9.3f}{s['p95']:>9.3f}{s['mean']:>9.3f}")
+        for count in COUNTS:
+            print(f"{count:<16}{summary[count]['mean']:>9.1f} per query")
+
+    def write_prometheus(self, path):
+        """
+        Write the aggregates in Prometheus text exposition format (for node_exporter's textfile collector)
+        """
+        summary = self.summary()
+        lines = [
+            "# HELP router_stage_seconds Wall time per router query stage",
+            "# TYPE router_stage_seconds summary",
+        ]
+        for stage in STAGES:
+            s = summary[stage]
+            lines.append(f'router_stage_seconds{{stage="{stage}",quantile="0.5"}} {s["p50"]}')
+            lines.append(f'router_stage_seconds{{stage="{stage}",quantile="0.95"}} {s["p95"]}')
+            lines.append(f'router_stage_seconds_sum{{stage="{stage}"}} {s["sum"]}')
+            lines.append(f'router_stage_seconds_count{{stage="{stage}"}} {len(self.traces)}')
+        for count in COUNTS:
+            lines.append(f"# TYPE router_{count}_total counter")
+            lines.append(f"router_{count}_total {summary[count]['sum']}")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+
+class TracedEngine:
+    def __init__(self, engine, tracer):
+        self.engine = engine
+        self.tracer = tracer
+
+    def query(self, question):
+        return self.tracer.query(self.engine, question)
+
+    async def aquery(self, question):
+        return await self.tracer.aquery(self.engine, question)
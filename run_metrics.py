@@ -0,0 +1,156 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RunMetrics:
+    """
+    Stage timings and counters for one scraper run.
+
+    Time a stage with `with metrics.stage("parse"):` or by decorating a
+    function with `@metrics.timed("extract")`; count events with
+    `metrics.count("fetches")`. Safe to use from crawler threads.
+    At the end of the run, `report()` prints a table and `write_summary()`
+    saves everything as JSON for comparing nightly runs.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        # stage -> [calls, total seconds, slowest call]
+        self.stages = {}
+        self.counters = Counter()
+        self.info = {}
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @contextmanager
+    def stage(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+
+    def timed(self, stage=None):
+        """
+        Decorator that times every call of a function as a stage (default: its name)
+        """
+        def decorate(func):
+            name = stage or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] += n
+
+    def summary(self):
+        """
+        Machine-readable summary of the run so far
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "calls": calls,
+                    "total_s": round(total, 6),
+                    "mean_s": round(total / calls, 6) if calls else 0.0,
+                    "max_s": round(slowest, 6),
+                }
+                for stage, (calls, total, slowest) in self.stages.items()
+            }
+            counters = dict(self.counters)
+        return {
+            "run": self.name,
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "duration_s": round(time.perf_counter() - self._started, 3),
+            "stages": stages,
+            "counters": counters,
+            "info": self.info,
+        }
+
+    def report(self):
+        summary = self.summary()
+        print(f"\nRun summary ({self.name}, {summary['duration_s']:.1f}s):")
+        # Slowest stages first, so the bottleneck is at the top
+        stages = sorted(summary["stages"].items(), key=lambda item: item[1]["total_s"], reverse=True)
+        for stage, s in stages:
+            print(f"  {stage:<16} {s['total_s']:>9.3f}s  {s['calls']:>6} calls  "
+                  f"mean {s['mean_s']:.4f}s  max {s['max_s']:.3f}s")
+        for counter, value in sorted(summary["counters"].items()):
+            print(f"  {counter:<16} {value:>9}")
+
+    def write_summary(self, path=None, directory="run_reports"):
+        """
+        Write the summary as JSON (default: run_reports/<run>-<timestamp>.json) and return the path
+        """
+        if path is None:
+            stamp = datetime.fromtimestamp(self.started).strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(directory, f"{self.name}-{stamp}.json")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"Run summary written to {path}")
+        return path
+
+
+_current = None
+
+
+def start_run(name):
+    """
+    Begin a new run; the module-level helpers below record into it
+    """
+    global _current
+    _current = RunMetrics(name)
+    return _current
+
+
+def current_run():
+    """
+    The run being recorded, started on first use if no scraper started one
+    """
+    if _current is None:
+        start_run("scraper")
+    return _current
+
+
+def stage(name):
+    return current_run().stage(name)
+
+
+def count(counter, n=1):
+    current_run().count(counter, n)
+
+
+def timed(name=None):
+    """
+    Like RunMetrics.timed, but records into whichever run is current at call time
+    """
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with current_run().stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
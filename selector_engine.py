@@ -0,0 +1,103 @@
+from collections import Counter
+
+import soupsieve as sv
+
+
+class SelectorEngine:
+    """
+    Match a list of CSS selectors against a page in a single pass.
+
+    All selectors are compiled once into one union query, so the document is
+    walked once and every matching element is returned once, in document order.
+    Matches inside a single-product match (e.g. the name and price blocks of a
+    product card) are dropped; matches inside a wrapper that holds several
+    similar matches (a product grid or list) are kept.
+    With track_hits=True the engine also counts how often each selector
+    actually matched, so selectors that never hit can be spotted and dropped.
+    That re-checks every match against every selector, so leave it off on the
+    normal parse path and turn it on for the pages you want to audit.
+    """
+
+    def __init__(self, selectors, fallback=None, track_hits=False):
+        self.selectors = list(selectors)
+        self._union = sv.compile(", ".join(self.selectors))
+        self._compiled = [(selector, sv.compile(selector)) for selector in self.selectors]
+        self._fallback = sv.compile(fallback) if fallback else None
+        self.track_hits = track_hits
+
+        self.pages = 0
+        self.fallback_pages = 0
+        self.tracked_pages = 0
+        self.hits = Counter()
+
+    def select(self, soup):
+        """
+        Return every product container matched by any selector, each element once
+        """
+        self.pages += 1
+        matches = self._drop_nested(self._union.select(soup))
+
+        if self.track_hits:
+            # Attribute hits to individual selectors by testing only the matched elements
+            self.tracked_pages += 1
+            for element in matches:
+                for selector, compiled in self._compiled:
+                    if compiled.match(element):
+                        self.hits[selector] += 1
+
+        if not matches and self._fallback is not None:
+            self.fallback_pages += 1
+            matches = self._drop_nested(self._fallback.select(soup))
+
+        return matches
+
+    @staticmethod
+    def _drop_nested(elements):
+        """
+        Drop elements whose nearest matched ancestor is a single product.
+        An ancestor counts as a wrapper when two of the matches directly below
+        it have the same tag and class, like the tiles of a grid.
+        """
+        matched = {id(element) for element in elements}
+        nearest = {}
+        below = {}
+        for element in elements:
+            for parent in element.parents:
+                if id(parent) in matched:
+                    nearest[id(element)] = id(parent)
+                    below.setdefault(id(parent), []).append(element)
+                    break
+        if not nearest:
+            return elements
+
+        wrappers = set()
+        for parent, children in below.items():
+            shapes = [(child.name, tuple(child.get("class") or ())) for child in children]
+            if len(set(shapes)) < len(shapes):
+                wrappers.add(parent)
+
+        return [
+            element for element in elements
+            if id(element) not in nearest or nearest[id(element)] in wrappers
+        ]
+
+    def dead_selectors(self):
+        """
+        Selectors that have not matched anything on any tracked page so far
+        (empty until a page has been parsed with track_hits on)
+        """
+        if not self.tracked_pages:
+            return []
+        return [selector for selector in self.selectors if not self.hits[selector]]
+
+    def report(self):
+        """
+        Summary of selector hit counts across all tracked pages
+        """
+        return {
+            "pages": self.pages,
+            "fallback_pages": self.fallback_pages,
+            "tracked_pages": self.tracked_pages,
+            "hits": {selector: self.hits[selector] for selector in self.selectors},
+            "dead": self.dead_selectors(),
+        }
@@ -0,0 +1,204 @@
+import csv
+import os
+
+import pandas as pd
+
+# Try importing pyarrow - without it the sinks fall back to chunked CSV
+pyarrow_available = True
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow_available = False
+
+# Column types for each site's output table
+SCHEMAS = {
+    "makro": [
+        ("Name", "string"),
+        ("Price", "float64"),
+    ],
+    "amazon": [
+        ("Title", "string"),
+        ("Price (USD & ZAR)", "string"),
+    ],
+    "amazon_products": [
+        ("query", "string"),
+        ("asin", "string"),
+        ("title", "string"),
+        ("price_usd", "float64"),
+        ("price_zar", "float64"),
+        ("page", "int64"),
+    ],
+    "property24": [
+        ("Title", "string"),
+        ("Price", "string"),
+        ("Location", "string"),
+        ("Bedrooms", "string"),
+        ("Bathrooms", "string"),
+        ("Parking", "string"),
+        ("Size", "string"),
+    ],
+    "property24_listings": [
+        ("listing_id", "string"),
+        ("area", "string"),
+        ("title", "string"),
+        ("price", "int64"),
+        ("location", "string"),
+        ("bedrooms", "float64"),
+        ("bathrooms", "float64"),
+        ("parking", "int64"),
+        ("size_m2", "int64"),
+        ("url", "string"),
+    ],
+}
+
+ARROW_TYPES = {
+    "string": "string",
+    "float64": "float64",
+    "int64": "int64",
+    "bool": "bool_",
+    "timestamp": "timestamp",
+}
+
+
+def arrow_schema(columns):
+    """
+    Build a pyarrow schema from (name, type) pairs
+    """
+    fields = []
+    for name, dtype in columns:
+        if dtype == "timestamp":
+            fields.append(pa.field(name, pa.timestamp("s")))
+        else:
+            fields.append(pa.field(name, getattr(pa, ARROW_TYPES[dtype])()))
+    return pa.schema(fields)
+
+
+class RecordSink:
+    """
+    Buffer records (dicts) and write them out in batches while a scrape runs.
+
+    Use as a context manager so the last batch is always flushed:
+
+        with open_sink("makro_perfumes.parquet", "makro") as sink:
+            sink.write(products)
+    """
+
+    def __init__(self, path, columns, batch_size=1000):
+        self.path = path
+        self.columns = columns
+        self.names = [name for name, _ in columns]
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer = []
+
+    def write(self, records):
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_one(self, record):
+        self.write([record])
+
+    def flush(self):
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def _write_batch(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Flush even on error so a crash keeps everything collected so far
+        self.close()
+        return False
+
+
+class CsvSink(RecordSink):
+    """
+    Append batches of records to a CSV file
+    """
+
+    def __init__(self, path, columns, batch_size=1000):
+        super().__init__(path, columns, batch_size)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.names, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def _write_batch(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetSink(RecordSink):
+    """
+    Append batches of records to a Parquet file as row groups with a fixed schema
+    """
+
+    def __init__(self, path, columns, batch_size=5000):
+        super().__init__(path, columns, batch_size)
+        self.schema = arrow_schema(columns)
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def _write_batch(self, records):
+        table = pa.Table.from_pylist(records, schema=self.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+def open_sink(path, site, batch_size=None):
+    """
+    Open a sink for a site's records. The format follows the file extension:
+    .parquet (falls back to .csv if pyarrow isn't installed) or .csv
+    """
+    columns = SCHEMAS[site]
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+
+    if path.endswith(".parquet"):
+        if pyarrow_available:
+            return ParquetSink(path, columns, **kwargs)
+        path = path[: -len(".parquet")] + ".csv"
+        print(f"pyarrow not available. Writing CSV instead: {path}")
+    return CsvSink(path, columns, **kwargs)
+
+
+def read_table(path, site=None):
+    """
+    Load a sink's output back into a DataFrame with the site's column types
+    """
+    if path.endswith(".parquet") and not os.path.exists(path):
+        path = path[: -len(".parquet")] + ".csv"
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    df = pd.read_csv(path)
+    if site:
+        for name, dtype in SCHEMAS[site]:
+            if name in df.columns and dtype == "timestamp":
+                df[name] = pd.to_datetime(df[name])
+            elif name in df.columns:
+                df[name] = df[name].astype(dtype if dtype != "int64" else "Int64")
+    return df
+
+
+def export_excel(path, xlsx_path, site=None):
+    """
+    Optional export step: convert a sink's output to an Excel file
+    """
+    df = read_table(path, site)
+    df.to_excel(xlsx_path, index=False)
+    print(f"Exported {len(df)} rows to {xlsx_path}")
+    return xlsx_path